@@ -44,7 +44,7 @@ def execute(cmd: Dict[str, Any]) -> Dict[str, Any]:
 
     # ---- Kraken (optional) ----
     if venue == "KRAKEN":
-        from kraken_executor import execute as kraken_exec
+        from executors.kraken_executor import execute as kraken_exec
         return _as_ok(kraken_exec(cmd))
 
     return {"status": "error", "message": f"unknown or disabled venue: {venue}", "fills": []}
@@ -38,6 +38,7 @@ import pathlib
 import re
 import time
 import traceback
+from functools import lru_cache
 from typing import Any, Dict, Optional, Tuple, List
 
 import requests
@@ -528,8 +529,9 @@ def maybe_balance_snapshot() -> None:
 
     if telemetry_db:
         try:
-            for venue, v in bals.items():
-                telemetry_db.upsert_balances(venue, v)
+            with telemetry_db.transaction():  # every venue in one commit
+                for venue, v in bals.items():
+                    telemetry_db.upsert_balances(venue, v)
         except Exception as e:
             _log(f"telemetry_db balances error: {e}")
 
@@ -606,10 +608,17 @@ def fetch_price(venue: str, base: str, quote: str) -> float:
 # ---------------------------------------------------------------------------
 
 
+_NON_ALPHA = re.compile(r"[^A-Z]")
+
+
+# Venue/symbol inputs come from a tiny fixed universe, so both are memoized:
+# repeat calls are one dict lookup instead of upper() + regex + f-strings.
+@lru_cache(maxsize=64)
 def _venue_key(v: str) -> str:
-    return re.sub(r"[^A-Z]", "", (v or "").upper())
+    return _NON_ALPHA.sub("", (v or "").upper())
 
 
+@lru_cache(maxsize=1024)
 def resolve_symbol(venue_key: str, base: str, quote: str) -> str:
     v = _venue_key(venue_key)
     if v in ("COINBASE", "COINBASEADV", "CBADV"):
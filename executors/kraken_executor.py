@@ -11,7 +11,8 @@
 #
 # Compatibility: Edge Agent calls execute_market_order(intent_dict)
 
-import os, time, hmac, hashlib, base64, urllib.parse, requests
+import os, time, hmac, hashlib, base64, string, threading, atexit, urllib.parse, requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Tuple, Optional
 from .kraken_util import to_kraken_altname
 
@@ -30,6 +31,83 @@ KEY  = os.getenv("KRAKEN_KEY", "")
 SEC  = os.getenv("KRAKEN_SECRET", "")  # base64 Kraken secret
 TIMEOUT = int(os.getenv("KRAKEN_TIMEOUT_S", "15"))
 
+# Decoded secret + keyed HMAC-SHA512 state, built once; _sign() copies it per call
+# so the key schedule isn't redone on every order/balance request.
+try:
+    _SEC_BYTES = base64.b64decode(SEC) if SEC else b""
+except Exception:
+    _SEC_BYTES = b""
+_HMAC_TEMPLATE = hmac.new(_SEC_BYTES, None, hashlib.sha512) if _SEC_BYTES else None
+
+# Small pool for overlapping the independent pre-order lookups (pair info,
+# balance, ticker) so the live path waits ~1 RTT instead of 3 in sequence.
+# Created on the first live order, so importing this module (dry-run, tests)
+# starts no threads.
+_IO_POOL: Optional[ThreadPoolExecutor] = None
+_IO_POOL_LOCK = threading.Lock()
+
+def _io_pool() -> ThreadPoolExecutor:
+    global _IO_POOL
+    if _IO_POOL is None:
+        with _IO_POOL_LOCK:
+            if _IO_POOL is None:
+                _IO_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="kr-io")
+    return _IO_POOL
+
+@atexit.register
+def _shutdown_io_pool() -> None:
+    if _IO_POOL is not None:
+        _IO_POOL.shutdown(wait=False)
+
+# Strictly increasing nonce: wall-clock ms, but never <= the last one issued.
+# Two calls in the same ms (or an NTP step backwards) would otherwise reuse a
+# nonce and get rejected by Kraken with EAPI:Invalid nonce. The counter lives
+# in memory; it is seeded from max(KRAKEN_NONCE_FILE, clock) at import and
+# written back at exit (and every _NONCE_SAVE_EVERY issues, in case of a
+# crash), so a restart after a clock step or a burst that ran ahead of the
+# clock still resumes above it. One process per API key is assumed.
+NONCE_FILE = os.getenv("KRAKEN_NONCE_FILE", ".kraken_nonce")
+_NONCE_SAVE_EVERY = 256
+_NONCE_LOCK = threading.Lock()
+
+def _load_nonce() -> int:
+    try:
+        with open(NONCE_FILE, "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except Exception:
+        return 0
+
+def _save_nonce(n: int) -> None:
+    tmp = f"{NONCE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(str(n))
+        os.replace(tmp, NONCE_FILE)
+    except Exception:
+        pass  # best effort: the in-memory floor still holds for this process
+
+def _seed_nonce() -> int:
+    return max(_load_nonce(), time.time_ns() // 1_000_000)
+
+_NONCE_LAST = _seed_nonce()
+_NONCE_ISSUED = 0
+
+def _next_nonce() -> str:
+    global _NONCE_LAST, _NONCE_ISSUED
+    with _NONCE_LOCK:
+        n = max(time.time_ns() // 1_000_000, _NONCE_LAST + 1)
+        _NONCE_LAST = n
+        _NONCE_ISSUED += 1
+        if _NONCE_ISSUED % _NONCE_SAVE_EVERY == 0:
+            _save_nonce(n)
+    return str(n)
+
+@atexit.register
+def _persist_nonce() -> None:
+    with _NONCE_LOCK:
+        if _NONCE_ISSUED:
+            _save_nonce(_NONCE_LAST)
+
 # --- helpers ----------------------------------------------------------------
 def _norm_receipt(base: Dict[str, Any], *, ok: bool, status: str, message: str, fills=None, **extra) -> Dict[str, Any]:
     out = {
@@ -91,14 +169,37 @@ def _ticker_price(pair: str) -> float:
     except Exception:
         return 0.0
 
+# Characters urlencode() leaves untouched; anything else goes through quote_plus.
+_SAFE = frozenset(string.ascii_letters + string.digits + "-._~")
+
+def _fast_urlencode(items) -> str:
+    # Byte-identical to urllib.parse.urlencode for flat str/number pairs, but skips
+    # the generic quoting machinery for the all-safe values Kraken payloads carry.
+    out = []
+    for k, v in items:
+        k = str(k)
+        v = str(v)
+        if not _SAFE.issuperset(k):
+            k = urllib.parse.quote_plus(k)
+        if not _SAFE.issuperset(v):
+            v = urllib.parse.quote_plus(v)
+        out.append(k + "=" + v)
+    return "&".join(out)
+
 def _sign(path: str, data: dict) -> dict:
-    nonce = str(int(time.time() * 1000))
+    nonce = _next_nonce()
     data = {**data, "nonce": nonce}
-    post = urllib.parse.urlencode({k: v for k, v in data.items() if v is not None})
-    sha256 = hashlib.sha256((nonce + post).encode()).digest()
-    sig = base64.b64encode(
-        hmac.new(base64.b64decode(SEC), path.encode() + sha256, hashlib.sha512).digest()
-    ).decode()
+    post = _fast_urlencode((k, v) for k, v in data.items() if v is not None)
+    inner = hashlib.sha256(nonce.encode())
+    inner.update(post.encode())
+    sha256 = inner.digest()
+    if _HMAC_TEMPLATE is not None:
+        h = _HMAC_TEMPLATE.copy()
+    else:
+        h = hmac.new(base64.b64decode(SEC), None, hashlib.sha512)
+    h.update(path.encode())
+    h.update(sha256)
+    sig = base64.b64encode(h.digest()).decode("ascii")
     return {"hdr": {"API-Key": KEY, "API-Sign": sig}, "qs": post}
 
 def _private(path: str, data: dict):
@@ -180,7 +281,12 @@ def _execute_market_order_core(
     if not (KEY and SEC):
         return _norm_receipt(base_payload, ok=False, status="error", message="Missing KRAKEN_KEY/KRAKEN_SECRET")
 
-    info = _pair_info(pair)
+    pool = _io_pool()
+    f_info = pool.submit(_pair_info, pair)
+    f_bal = pool.submit(_balance)
+    f_px = pool.submit(_ticker_price, pair) if side_uc == "BUY" else None
+
+    info = f_info.result()
     default_min = 0.00005 if pair.startswith("XBT") else 0.0
     try:
         ordermin = float(info.get("ordermin", default_min) or default_min)
@@ -188,7 +294,7 @@ def _execute_market_order_core(
         ordermin = default_min
 
     try:
-        bals = _balance()
+        bals = f_bal.result()
     except Exception:
         bals = {}
 
@@ -207,7 +313,7 @@ def _execute_market_order_core(
                 pre_balances={quote_asset: free_q},
             )
 
-        px = _ticker_price(pair) or 0.0
+        px = f_px.result() or 0.0
         qty = round((q_spend / (px or 1.0)), 8)
         if qty < ordermin:
             return _norm_receipt(base_payload, ok=False, status="error", message=f"min volume {ordermin:.8f} not met")
@@ -302,3 +408,12 @@ def execute_market_order(intent: dict | None = None) -> Dict[str, Any]:
         edge_mode=edge_mode,
         edge_hold=edge_hold_flag,
     )
+
+def execute(cmd: dict | None = None) -> Dict[str, Any]:
+    """Bus command adapter: unwraps {"payload": {...}} and maps broker_router field names."""
+    payload = dict((cmd or {}).get("payload") or cmd or {})
+    if payload.get("amount_quote") is None and payload.get("quote_amount") is not None:
+        payload["amount_quote"] = payload.get("quote_amount")
+    if not payload.get("client_id"):
+        payload["client_id"] = (cmd or {}).get("id") or payload.get("client_order_id") or ""
+    return execute_market_order(payload)
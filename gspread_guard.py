@@ -1,5 +1,6 @@
 # gspread_guard.py — wrap legacy gspread calls with Nova utils (cache + gates + backoff)
-import os, time
+import os, sys, time, logging
+from collections import OrderedDict
 from functools import wraps
 
 # Pull our quota-safe wrappers
@@ -14,9 +15,10 @@ from utils import (
 ENABLE   = os.getenv("NOVA_PATCH_GSPREAD", "1") == "1"
 TTL_VALS = int(os.getenv("GSPREAD_GUARD_TTL_SEC", "300"))       # 5m cache for values
 VERBOSE  = os.getenv("GSPREAD_GUARD_VERBOSE", "1") == "1"
+_MAX     = int(os.getenv("GSPREAD_GUARD_MAX", "256"))            # max cached entries (LRU)
 
-# In-process per-worksheet cache keyed by (spreadsheet_id, title, kind)
-_CACHE = {}  # { (id, title, "values"): (ts, data) }
+# In-process per-worksheet LRU cache keyed by (spreadsheet_id, title, kind)
+_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()  # { (id, title, "values"): (ts, data) }
 
 def _ws_key(ws, kind="values"):
     try:
@@ -30,15 +32,30 @@ def _cache_get(ws, kind, ttl):
     k = _ws_key(ws, kind)
     ent = _CACHE.get(k)
     if ent and (time.time() - ent[0]) < ttl:
+        _CACHE.move_to_end(k)
         return ent[1]
     return None
 
 def _cache_put(ws, kind, data):
-    _CACHE[_ws_key(ws, kind)] = (time.time(), data)
-
-def _log(msg):
-    if VERBOSE:
-        print(f"🧩 gspread_guard: {msg}")
+    k = _ws_key(ws, kind)
+    _CACHE[k] = (time.time(), data)
+    _CACHE.move_to_end(k)
+    while len(_CACHE) > _MAX:
+        _CACHE.popitem(last=False)
+
+def _cache_drop(ws):
+    # Writes may have applied (even partially) — never serve the old grid after one.
+    for kind in ("values", "columns"):
+        _CACHE.pop(_ws_key(ws, kind), None)
+
+# Lazy %-style logging: messages are only formatted when VERBOSE enables DEBUG.
+log = logging.getLogger("gspread_guard")
+log.setLevel(logging.DEBUG if VERBOSE else logging.WARNING)
+if VERBOSE and not log.handlers:
+    _h = logging.StreamHandler(sys.stdout)
+    _h.setFormatter(logging.Formatter("🧩 gspread_guard: %(message)s"))
+    log.addHandler(_h)
+    log.propagate = False
 
 def _patch():
     import gspread
@@ -63,16 +80,16 @@ def _patch():
     def get_all_values_patched(self, *args, **kwargs):
         cached = _cache_get(self, "values", TTL_VALS)
         if cached is not None:
-            _log(f"get_all_values → cache hit ({self.title})")
+            log.debug("get_all_values → cache hit (%s)", self.title)
             return cached
-        _log(f"get_all_values → utils (API) ({self.title})")
+        log.debug("get_all_values → utils (API) (%s)", self.title)
         vals = _ws_get_all_values(self)
         _cache_put(self, "values", vals)
         return vals
 
     def get_all_records_patched(self, *args, **kwargs):
         # Use our per-title cache
-        _log(f"get_all_records → utils cached ({self.title})")
+        log.debug("get_all_records → utils cached (%s)", self.title)
         return ws_get_all_records_cached(self, ttl_s=TTL_VALS)
 
     def row_values_patched(self, idx, *args, **kwargs):
@@ -83,29 +100,55 @@ def _patch():
     def col_values_patched(self, idx, *args, **kwargs):
         vals = get_all_values_patched(self)
         j = int(idx) - 1
-        return [row[j] for row in vals if j < len(row)] if j >= 0 else []
+        if j < 0:
+            return []
+        # Columns are built once per cached grid; the identity check ties them
+        # to the exact values list they were derived from.
+        ent = _cache_get(self, "columns", TTL_VALS)
+        if ent is not None and ent[0] is vals:
+            cols = ent[1]
+        else:
+            width = max((len(row) for row in vals), default=0)
+            cols = [[row[c] for row in vals if c < len(row)] for c in range(width)]
+            _cache_put(self, "columns", (vals, cols))
+        return cols[j] if j < len(cols) else []
 
     # Writes
     def update_cell_patched(self, r, c, v, *args, **kwargs):
-        _log(f"update_cell → utils ({self.title}:{r},{c})")
-        return _ws_update_cell(self, r, c, v)
+        log.debug("update_cell → utils (%s:%s,%s)", self.title, r, c)
+        try:
+            return _ws_update_cell(self, r, c, v)
+        finally:
+            _cache_drop(self)
 
     def update_acell_patched(self, a1, v, *args, **kwargs):
-        _log(f"update_acell → utils ({self.title}:{a1})")
-        return _ws_update_acell(self, a1, v)
+        log.debug("update_acell → utils (%s:%s)", self.title, a1)
+        try:
+            return _ws_update_acell(self, a1, v)
+        finally:
+            _cache_drop(self)
 
     def update_patched(self, rng, rows, *args, **kwargs):
-        _log(f"update(range) → utils.batch ({self.title}:{rng})")
+        log.debug("update(range) → utils.batch (%s:%s)", self.title, rng)
         # Normalize to our batch_update signature
-        return ws_batch_update(self, [{"range": rng, "values": rows}])
+        try:
+            return ws_batch_update(self, [{"range": rng, "values": rows}])
+        finally:
+            _cache_drop(self)
 
     def append_row_patched(self, row, *args, **kwargs):
-        _log(f"append_row → utils ({self.title})")
-        return _ws_append_row(self, row)
+        log.debug("append_row → utils (%s)", self.title)
+        try:
+            return _ws_append_row(self, row)
+        finally:
+            _cache_drop(self)
 
     def batch_update_patched(self, data, *args, **kwargs):
-        _log(f"batch_update → utils ({self.title})")
-        return ws_batch_update(self, data)
+        log.debug("batch_update → utils (%s)", self.title)
+        try:
+            return ws_batch_update(self, data)
+        finally:
+            _cache_drop(self)
 
     # Install
     Worksheet.get_all_values  = get_all_values_patched
@@ -118,10 +161,10 @@ def _patch():
     Worksheet.append_row      = append_row_patched
     if _orig_batch_update: Worksheet.batch_update = batch_update_patched
 
-    _log("patched gspread.Worksheet methods (cache+gates+backoff)")
+    log.debug("patched gspread.Worksheet methods (cache+gates+backoff)")
 
 if ENABLE:
     try:
         _patch()
     except Exception as e:
-        _log(f"patch failed (non-fatal): {e}")
+        log.warning("patch failed (non-fatal): %s", e)
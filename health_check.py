@@ -2,19 +2,30 @@ import os
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
-REQUIRED_TABS = [
+REQUIRED_TABS = (
     "Scout Decisions", "Rotation_Planner", "Rotation_Log", "ROI_Review_Log",
     "Claim_Tracker", "NovaHeartbeat", "Portfolio_Targets", "Token_Vault"
-]
+)
+
+# Reused across health checks; rebuilt only when the OAuth token has expired.
+_CREDS = None
+_CLIENT = None
+
+def _client():
+    global _CREDS, _CLIENT
+    if _CLIENT is None or getattr(_CREDS, "access_token_expired", False):
+        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+        _CREDS = ServiceAccountCredentials.from_json_keyfile_name("sentiment-log-service.json", scope)
+        _CLIENT = gspread.authorize(_CREDS)
+    return _CLIENT
 
 def run_health_check():
     try:
         print("🩺 Running health check...")
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds = ServiceAccountCredentials.from_json_keyfile_name("sentiment-log-service.json", scope)
-        client = gspread.authorize(creds)
-        sheet = client.open_by_url(os.getenv("SHEET_URL"))
-        tabs = [ws.title for ws in sheet.worksheets()]
+        sheet = _client().open_by_url(os.getenv("SHEET_URL"))
+        # Ask only for tab titles instead of building full Worksheet objects
+        meta = sheet.fetch_sheet_metadata(params={"fields": "sheets.properties.title"})
+        tabs = {s["properties"]["title"] for s in meta.get("sheets", [])}
 
         missing = [tab for tab in REQUIRED_TABS if tab not in tabs]
         if missing:
@@ -1,5 +1,21 @@
 # hmac_auth.py — HMAC signing & verification (shared with edge)
 import hmac, hashlib, time
+from functools import lru_cache
+
+@lru_cache(maxsize=16)
+def _template(secret: str):
+    # Keyed HMAC-SHA256 state per secret; callers .copy() it so the key
+    # schedule runs once per secret instead of once per sign/verify.
+    return hmac.new(secret.encode(), b"", hashlib.sha256)
+
+def _digest(secret: str, body: bytes, ts: str) -> bytes:
+    # Feed the pieces incrementally rather than building ts + "." + body,
+    # which would copy the whole body once more per call.
+    h = _template(secret).copy()
+    h.update(ts.encode())
+    h.update(b".")
+    h.update(body)
+    return h.digest()
 
 def sign(secret: str, body: bytes, ts: str) -> str:
     """
@@ -8,8 +24,7 @@ def sign(secret: str, body: bytes, ts: str) -> str:
     - body: raw request/response bytes (exactly as sent)
     - ts: unix timestamp string (e.g., "1693612345")
     """
-    msg = ts.encode() + b"." + body
-    return hmac.new(secret.encode(), msg, hashlib.sha256).hexdigest()
+    return _digest(secret, body, ts).hex()  # hex only at the wire
 
 def verify(secret: str, body: bytes, ts: str, sig: str, ttl_s: int = 180) -> bool:
     """
@@ -21,5 +36,9 @@ def verify(secret: str, body: bytes, ts: str, sig: str, ttl_s: int = 180) -> boo
         return False
     if not secret or abs(time.time() - ts_i) > ttl_s:
         return False
+    # A SHA-256 hexdigest is always 64 chars; that length is public, so bailing
+    # out early on anything else leaks nothing about the key.
+    if not sig or len(sig) != 64:
+        return False
     expected = sign(secret, body, ts)
-    return hmac.compare_digest(expected, sig or "")
+    return hmac.compare_digest(expected, sig)
@@ -1,5 +1,6 @@
 # hmac_utils.py — The Single Source of Truth for Signing
 import os, hmac, hashlib, json
+from urllib.parse import urlencode
 
 # Allow overriding secret env var name
 def get_secret(env_var="OUTBOX_SECRET"):
@@ -9,26 +10,63 @@ def get_secret(env_var="OUTBOX_SECRET"):
         s = os.getenv("EDGE_SECRET", "")
     return s
 
-def canonical_bytes(body: dict) -> bytes:
+def canonical_bytes(body: dict, ensure_ascii: bool = True) -> bytes:
     """
     Produce the Canonical JSON bytes:
     - No spaces (separators=(',',':'))
     - Sorted keys (sort_keys=True)
+    - ensure_ascii=False keeps non-ASCII as raw UTF-8 (ops enqueue form)
     This MUST match the Bus's _verify_robust logic.
     """
-    return json.dumps(body, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return json.dumps(body, separators=(",", ":"), sort_keys=True, ensure_ascii=ensure_ascii).encode("utf-8")
+
+# secret str -> keyed HMAC prototype; secrets are few and fixed per process,
+# so the key padding is done once and each signature is copy() + update().
+_HMAC_PROTOS: dict = {}
+
+def _hmac_digest(secret: str, msg: bytes) -> bytes:
+    proto = _HMAC_PROTOS.get(secret)
+    if proto is None:
+        proto = _HMAC_PROTOS[secret] = hmac.new(secret.encode("utf-8"), None, hashlib.sha256)
+    m = proto.copy()
+    m.update(msg)
+    return m.digest()
+
+def _hmac_hex(secret: str, msg: bytes) -> str:
+    # raw digest internally; hex only for the header value
+    return _hmac_digest(secret, msg).hex()
 
 def sign(body: dict, secret: str) -> str:
     """Generate HMAC-SHA256 signature."""
     if not secret: return ""
     msg = canonical_bytes(body)
-    return hmac.new(secret.encode("utf-8"), msg, hashlib.sha256).hexdigest()
+    return _hmac_hex(secret, msg)
 
-def get_auth_headers(body: dict, secret: str) -> dict:
-    """Return the full headers dict for requests."""
-    sig = sign(body, secret)
+def canonical_sign(secret_b: bytes, params: dict) -> tuple:
+    """
+    Exchange-style query signing (MEXC v3):
+    returns (qs, sig) where qs is the url-encoded, key-sorted query string and
+    sig is its HMAC-SHA256 hexdigest. Send exactly f"{qs}&signature={sig}".
+    """
+    qs = urlencode(sorted(params.items()))
+    return qs, hmac.digest(secret_b, qs.encode(), "sha256").hex()
+
+def _auth_headers(sig: str) -> dict:
     return {
         "Content-Type": "application/json",
         "X-Nova-Signature": sig,  # Modern standard header
         "X-NT-Sig": sig           # Legacy alias
     }
+
+def get_auth_headers(body: dict, secret: str) -> dict:
+    """Return the full headers dict for requests."""
+    return _auth_headers(sign(body, secret))
+
+def signed_request(body: dict, secret: str) -> tuple:
+    """
+    Serialize once: returns (raw, headers) where raw is the canonical body to
+    POST and headers carry the signature over exactly those bytes.
+    """
+    raw = canonical_bytes(body)
+    sig = _hmac_hex(secret, raw) if secret else ""
+    return raw, _auth_headers(sig)
@@ -1,9 +1,30 @@
-from datetime import datetime
+import atexit, threading, time
+
+# One line-buffered append handle per log file, kept open for the process lifetime.
+_FILES = {}
+_LOCK = threading.Lock()
+
+def _handle(file):
+    f = _FILES.get(file)
+    if f is None:
+        f = _FILES[file] = open(file, 'a', buffering=1)
+    return f
 
 def log_local(message, file='local_log.txt'):
     try:
-        now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-        with open(file, 'a') as f:
-            f.write(f"[{now}] {message}\n")
+        now = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+        with _LOCK:
+            _handle(file).write(f"[{now}] {message}\n")
     except Exception as e:
-        print(f"❌ Local log write failed: {e}")
\ No newline at end of file
+        print(f"❌ Local log write failed: {e}")
+
+def close_log():
+    with _LOCK:
+        for f in _FILES.values():
+            try:
+                f.close()
+            except Exception:
+                pass
+        _FILES.clear()
+
+atexit.register(close_log)
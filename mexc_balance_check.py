@@ -1,22 +1,25 @@
-import os
 import time
-import hmac
-import hashlib
 import requests
-from urllib.parse import urlencode
-from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from config import MEXC_API_KEY, MEXC_API_SECRET, MEXC_BASE_URL
+from hmac_utils import canonical_sign
 
-load_dotenv()
+try:
+    import orjson
+    _loads = orjson.loads
+except Exception:  # pragma: no cover
+    import json
+    _loads = json.loads
 
-API_KEY = os.getenv("MEXC_API_KEY")
-API_SECRET = os.getenv("MEXC_API_SECRET")
-BASE_URL = "https://api.mexc.com"
+API_KEY = MEXC_API_KEY
+API_SECRET = MEXC_API_SECRET
+BASE_URL = MEXC_BASE_URL
+_SECRET_B = (API_SECRET or "").encode("utf-8")
 
-def _sign(params):
-    query_string = urlencode(params)
-    signature = hmac.new(API_SECRET.encode(), query_string.encode(), hashlib.sha256).hexdigest()
-    params['signature'] = signature
-    return params
+# Keep-alive pool so repeated signed calls reuse one TLS connection
+_SESSION = requests.Session()
+_SESSION.headers.update({"Content-Type": "application/json", "ApiKey": API_KEY})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
 
 def get_balance(asset="USDT"):
     try:
@@ -24,16 +27,12 @@ def get_balance(asset="USDT"):
         params = {
             "timestamp": timestamp
         }
-        signed = _sign(params)
-        headers = {
-            "Content-Type": "application/json",
-            "ApiKey": API_KEY
-        }
+        qs, sig = canonical_sign(_SECRET_B, params)
         url = f"{BASE_URL}/api/v3/account"
-        response = requests.get(url, headers=headers, params=signed)
+        response = _SESSION.get(url, params=f"{qs}&signature={sig}")
         response.raise_for_status()
-        balances = response.json().get("balances", [])
-        for bal in balances:
+        # Parse the raw bytes once and stop at the first matching asset
+        for bal in _loads(response.content).get("balances", ()):
             if bal["asset"] == asset:
                 return float(bal["free"])
         return 0.0
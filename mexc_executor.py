@@ -1,65 +1,136 @@
 # mexc_executor.py — NovaTrade MEXC spot executor (idempotent + retry-safe)
-import os, time, hmac, hashlib, requests, json
+import os, time, random, sqlite3, threading, logging, requests, json
 from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+
+from hmac_utils import canonical_sign
+
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
 
 MEXC_KEY    = os.getenv("MEXC_KEY", "")
 MEXC_SECRET = os.getenv("MEXC_SECRET", "")
 MEXC_BASE   = os.getenv("MEXC_BASE_URL", "https://api.mexc.com")
 TIMEOUT_S   = float(os.getenv("MEXC_TIMEOUT_S", "10"))
+CONNECT_S   = float(os.getenv("MEXC_CONNECT_S", "3"))
 RETRIES     = int(os.getenv("MEXC_RETRIES", "3"))
 BACKOFF_S   = float(os.getenv("MEXC_BACKOFF_S", "0.9"))
 QUOTE_MODE  = os.getenv("MEXC_QUOTE_MODE", "true").lower() in {"1","true","yes"}
 IDEMP_FILE  = os.getenv("IDEMP_STORE", "mexc_idempotency.json")
+_SECRET_B   = MEXC_SECRET.encode("utf-8")
+
+# Keep-alive pool to MEXC; _r() owns the retry loop, so the adapter doesn't retry.
+_SESSION = requests.Session()
+_SESSION.headers.update({"X-MEXC-APIKEY": MEXC_KEY, "Content-Type": "application/json"})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+# (connect, read): a dead connect fails fast instead of burning the full read budget
+_TIMEOUT = (CONNECT_S, TIMEOUT_S)
+
+# Opt-in HTTP/2 (MEXC_HTTP2=1 + httpx[http2] installed): one multiplexed connection
+# for bursts of signed calls. Same request()/status_code/content surface.
+if os.getenv("MEXC_HTTP2", "0") == "1":
+    try:
+        import httpx
+        _SESSION = httpx.Client(http2=True, headers=dict(_SESSION.headers),
+                                limits=httpx.Limits(max_keepalive_connections=8))
+        _TIMEOUT = httpx.Timeout(TIMEOUT_S, connect=CONNECT_S)
+    except Exception as e:
+        logging.getLogger("mexc_executor").warning(
+            "MEXC_HTTP2=1 but httpx[http2] unavailable (%s); using requests", e)
+
+def _loads(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+# Idempotency store: SQLite in WAL mode, one row per acked clientOrderId.
+# Lookups and writes are single B-tree operations instead of parsing or
+# rewriting a growing JSON file per order. A legacy JSON store at IDEMP_FILE
+# is imported once when the table is first created.
+IDEMP_DB = os.getenv("IDEMP_DB", os.path.splitext(IDEMP_FILE)[0] + ".db")
 
-def _load_store() -> dict:
+_SQL_SEL = "SELECT receipt FROM ack WHERE cid=?"
+_SQL_INS = "INSERT OR REPLACE INTO ack(cid, receipt) VALUES(?,?)"
+
+_DB: Optional[sqlite3.Connection] = None
+_DB_LOCK = threading.Lock()
+
+def _load_legacy_store() -> dict:
     try:
-        with open(IDEMP_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(IDEMP_FILE, "rb") as f:
+            return _loads(f.read())
     except Exception:
         return {}
 
-def _save_store(d: dict):
-    try:
-        with open(IDEMP_FILE, "w", encoding="utf-8") as f:
-            json.dump(d, f, separators=(",", ":"), ensure_ascii=False)
-    except Exception:
-        pass
+def _db() -> sqlite3.Connection:
+    global _DB
+    if _DB is None:
+        with _DB_LOCK:
+            if _DB is None:
+                con = sqlite3.connect(IDEMP_DB, isolation_level=None, timeout=10, check_same_thread=False)
+                con.execute("PRAGMA journal_mode=WAL;")
+                con.execute("PRAGMA synchronous=NORMAL;")
+                fresh = con.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='ack'"
+                ).fetchone() is None
+                con.execute("CREATE TABLE IF NOT EXISTS ack(cid TEXT PRIMARY KEY, receipt BLOB)")
+                if fresh:
+                    legacy = _load_legacy_store()
+                    if legacy:
+                        con.execute("BEGIN")
+                        con.executemany(_SQL_INS, [(k, _dumps(v)) for k, v in legacy.items()])
+                        con.execute("COMMIT")
+                _DB = con
+    return _DB
 
 def already_acked(client_order_id: str):
-    return _load_store().get(client_order_id)
+    try:
+        row = _db().execute(_SQL_SEL, (client_order_id,)).fetchone()
+        return _loads(row[0]) if row else None
+    except Exception:
+        return None
 
 def remember_acked(client_order_id: str, receipt: dict):
-    d = _load_store()
-    d[client_order_id] = receipt
-    _save_store(d)
+    try:
+        con = _db()
+        with _DB_LOCK:
+            con.execute(_SQL_INS, (client_order_id, _dumps(receipt)))
+    except Exception:
+        pass
 
 def _ts_ms() -> str:
     return str(int(time.time() * 1000))
 
-def _sign(query: str) -> str:
-    return hmac.new(MEXC_SECRET.encode(), query.encode(), hashlib.sha256).hexdigest()
-
-def _headers() -> dict:
-    return {"X-MEXC-APIKEY": MEXC_KEY, "Content-Type": "application/json"}
-
 def _r(method: str, path: str, params: dict | None = None, body: dict | None = None, signed: bool = False):
     url = f"{MEXC_BASE}{path}"
     params = (params or {}).copy()
     if signed:
         params["timestamp"] = _ts_ms()
-        qs = "&".join([f"{k}={params[k]}" for k in sorted(params)])
-        params["signature"] = _sign(qs)
+        # Send exactly the sorted query string that was signed.
+        qs, sig = canonical_sign(_SECRET_B, params)
+        params = f"{qs}&signature={sig}"
+    method = method.upper()
+    q = params if method in {"GET","DELETE"} else None
+    j = body if method in {"POST","PUT"} else None
     for attempt in range(1, RETRIES+1):
         try:
-            resp = requests.request(method.upper(), url,
-                                    params=params if method.upper() in {"GET","DELETE"} else None,
-                                    json=body if method.upper() in {"POST","PUT"} else None,
-                                    headers=_headers(), timeout=TIMEOUT_S)
-            resp.raise_for_status()
-            return resp.json()
+            resp = _SESSION.request(method, url, params=q, json=j, timeout=_TIMEOUT)
+            # inline status check; parse the raw bytes once on the success path
+            if resp.status_code >= 400:
+                raise requests.HTTPError(f"{resp.status_code} for {method} {path}: {resp.text[:200]}", response=resp)
+            return _loads(resp.content)
         except Exception as e:
             if attempt >= RETRIES: raise
-            time.sleep(BACKOFF_S * attempt)
+            # linear backoff + jitter so parallel callers don't retry in lockstep
+            time.sleep(BACKOFF_S * attempt + random.uniform(0, BACKOFF_S))
 
 def normalize_symbol(symbol: str) -> str:
     return symbol.replace("/", "").upper()
@@ -1,21 +1,24 @@
-import os
 import time
-import hmac
-import hashlib
 import requests
-from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from config import MEXC_API_KEY, MEXC_API_SECRET, MEXC_BASE_URL
+from hmac_utils import canonical_sign
 
-# Load from .env if applicable
-load_dotenv()
+# .env is loaded once by config
+API_KEY = MEXC_API_KEY
+API_SECRET = MEXC_API_SECRET
+BASE_URL = MEXC_BASE_URL
+_SECRET_B = (API_SECRET or "").encode("utf-8")
 
-API_KEY = os.getenv("MEXC_API_KEY")
-API_SECRET = os.getenv("MEXC_API_SECRET")
-BASE_URL = "https://api.mexc.com"
+# Keep-alive pool shared by the diagnostics below
+_SESSION = requests.Session()
+_SESSION.headers.update({"X-MEXC-APIKEY": API_KEY})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
 
 # Fetch all supported symbols
 def get_supported_symbols():
     try:
-        r = requests.get(f"{BASE_URL}/api/v3/exchangeInfo")
+        r = _SESSION.get(f"{BASE_URL}/api/v3/exchangeInfo")
         return [s["symbol"] for s in r.json()["symbols"]]
     except Exception as e:
         print(f"❌ Failed to fetch exchange info: {e}")
@@ -23,17 +26,15 @@ def get_supported_symbols():
 
 # Sign request parameters
 def sign(params):
-    query = '&'.join([f"{k}={v}" for k, v in sorted(params.items())])
-    sig = hmac.new(API_SECRET.encode(), query.encode(), hashlib.sha256).hexdigest()
+    query, sig = canonical_sign(_SECRET_B, params)
     return f"{query}&signature={sig}"
 
 # Test an individual endpoint
 def test_endpoint(name, method, path, params={}):
     params["timestamp"] = int(time.time() * 1000)
     query = sign(params)
-    headers = {"X-MEXC-APIKEY": API_KEY}
     url = f"{BASE_URL}{path}?{query}"
-    r = requests.request(method, url, headers=headers)
+    r = _SESSION.request(method, url)
     try:
         json = r.json()
     except:
@@ -46,7 +47,7 @@ def test_endpoint(name, method, path, params={}):
 def simulate_trade(symbol="DOGEUSDT", usdt_threshold=1):
     # Step 1: Fetch price
     try:
-        price_data = requests.get(f"{BASE_URL}/api/v3/ticker/price", params={"symbol": symbol}).json()
+        price_data = _SESSION.get(f"{BASE_URL}/api/v3/ticker/price", params={"symbol": symbol}).json()
         price = float(price_data["price"])
     except Exception as e:
         print(f"❌ Price fetch failed: {e}")
@@ -1,26 +1,54 @@
 # mexc_receipt_fetch.py
-import os, time, hmac, hashlib, urllib.parse, requests, json
-from dotenv import load_dotenv; load_dotenv()
+import os, time, logging, requests, json
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
-BASE  = (os.getenv("MEXC_BASE_URL") or "https://api.mexc.com").rstrip("/")
-KEY   = os.getenv("MEXC_KEY") or os.getenv("MEXC_API_KEY") or ""
-SECRET= os.getenv("MEXC_SECRET") or os.getenv("MEXC_API_SECRET") or ""
+try:
+    import orjson
+    _loads = orjson.loads
+except Exception:  # pragma: no cover
+    _loads = json.loads
 
-def _sign(params: dict) -> str:
-    qs = urllib.parse.urlencode(params)
-    return hmac.new(SECRET.encode(), qs.encode(), hashlib.sha256).hexdigest()
+from config import MEXC_API_KEY, MEXC_API_SECRET, MEXC_BASE_URL  # loads .env once
+from hmac_utils import canonical_sign
+
+log = logging.getLogger("mexc_receipt_fetch")
+
+BASE  = MEXC_BASE_URL
+KEY   = os.getenv("MEXC_KEY") or MEXC_API_KEY
+SECRET= os.getenv("MEXC_SECRET") or MEXC_API_SECRET
+_SECRET_B = SECRET.encode("utf-8")
+
+# Keep-alive pool so order + trades lookups reuse one TLS connection
+_SESSION = requests.Session()
+_SESSION.headers.update({"X-MEXC-APIKEY": KEY})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+_TIMEOUT = (float(os.getenv("MEXC_CONNECT_S", "3")), 15.0)  # (connect, read)
+
+# Opt-in HTTP/2 (MEXC_HTTP2=1 + httpx[http2] installed): the concurrent order/trade
+# lookups below multiplex over one connection instead of opening one each.
+if os.getenv("MEXC_HTTP2", "0") == "1":
+    try:
+        import httpx
+        _SESSION = httpx.Client(http2=True, headers={"X-MEXC-APIKEY": KEY},
+                                limits=httpx.Limits(max_keepalive_connections=8))
+        _TIMEOUT = httpx.Timeout(_TIMEOUT[1], connect=_TIMEOUT[0])
+    except Exception as e:
+        log.warning("MEXC_HTTP2=1 but httpx[http2] unavailable (%s); using requests", e)
+
+def _signed_qs(params: dict) -> str:
+    qs, sig = canonical_sign(_SECRET_B, params)
+    return f"{qs}&signature={sig}"
 
 def get_order(symbol: str, order_id: str):
     params = {"symbol": symbol.replace("/","").upper(), "orderId": order_id, "timestamp": int(time.time()*1000), "recvWindow": 5000}
-    sig = _sign(params)
-    r = requests.get(f"{BASE}/api/v3/order", params={**params, "signature": sig}, headers={"X-MEXC-APIKEY": KEY}, timeout=15)
-    return r.status_code, r.json() if r.headers.get("content-type","").startswith("application/json") else r.text
+    r = _SESSION.get(f"{BASE}/api/v3/order", params=_signed_qs(params), timeout=_TIMEOUT)
+    return r.status_code, _loads(r.content) if r.headers.get("content-type","").startswith("application/json") else r.text
 
 def get_trades(symbol: str, order_id: str):
     params = {"symbol": symbol.replace("/","").upper(), "orderId": order_id, "timestamp": int(time.time()*1000), "recvWindow": 5000}
-    sig = _sign(params)
-    r = requests.get(f"{BASE}/api/v3/myTrades", params={**params, "signature": sig}, headers={"X-MEXC-APIKEY": KEY}, timeout=15)
-    return r.status_code, r.json() if r.headers.get("content-type","").startswith("application/json") else r.text
+    r = _SESSION.get(f"{BASE}/api/v3/myTrades", params=_signed_qs(params), timeout=_TIMEOUT)
+    return r.status_code, _loads(r.content) if r.headers.get("content-type","").startswith("application/json") else r.text
 
 if __name__ == "__main__":
     # paste one of your orderIds here:
@@ -28,9 +56,13 @@ if __name__ == "__main__":
         "C02__592712390852882432028",
         "C02__592712395454066688028",
     ]
+    # All 2N lookups go out at once over the shared session; print in input order.
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        futs = {(oid, fn.__name__): ex.submit(fn, "MX/USDT", oid)
+                for oid in order_ids for fn in (get_order, get_trades)}
     for oid in order_ids:
         print("\nORDER", oid)
-        sc, jo = get_order("MX/USDT", oid)
+        sc, jo = futs[(oid, "get_order")].result()
         print("order:", sc, json.dumps(jo, ensure_ascii=False))
-        sc, jt = get_trades("MX/USDT", oid)
+        sc, jt = futs[(oid, "get_trades")].result()
         print("trades:", sc, json.dumps(jt, ensure_ascii=False))
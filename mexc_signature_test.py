@@ -1,33 +1,24 @@
-import hmac
-import hashlib
 import time
 import requests
-import os
-from urllib.parse import urlencode
-from dotenv import load_dotenv
+from config import MEXC_API_KEY, MEXC_API_SECRET, MEXC_BASE_URL
+from hmac_utils import canonical_sign
 
-load_dotenv()
-
-BASE_URL = "https://api.mexc.com"
-API_KEY = os.getenv("MEXC_API_KEY")
-API_SECRET = os.getenv("MEXC_API_SECRET")
-
-def sign(params, secret):
-    query_string = urlencode(params)
-    return hmac.new(secret.encode(), query_string.encode(), hashlib.sha256).hexdigest()
+BASE_URL = MEXC_BASE_URL
+API_KEY = MEXC_API_KEY
+API_SECRET = MEXC_API_SECRET
 
 timestamp = int(time.time() * 1000)
 params = {
     "timestamp": timestamp,
     "recvWindow": 5000
 }
-params["signature"] = sign(params, API_SECRET)
+qs, sig = canonical_sign((API_SECRET or "").encode("utf-8"), params)
 
 headers = {
     "X-MEXC-APIKEY": API_KEY
 }
 
-response = requests.get(f"{BASE_URL}/api/v3/account", headers=headers, params=params)
+response = requests.get(f"{BASE_URL}/api/v3/account", headers=headers, params=f"{qs}&signature={sig}")
 
 print(f"🔗 URL: {response.url}")
 print(f"📦 Response: {response.status_code} | {response.text}")
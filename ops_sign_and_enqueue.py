@@ -13,13 +13,25 @@ from __future__ import annotations
 import argparse
 import hashlib
 import hmac
-import json
 import os
 import sys
 import time
 from typing import Any, Dict, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from hmac_utils import canonical_bytes
+
+# Keep-alive pool: the signing trials below all hit the same /ops/enqueue host.
+# Status retries stay off so a 5xx/401 still reaches the trial loop untouched;
+# only connect failures (nothing sent yet) are retried by the adapter.
+CONNECT_S = float(os.getenv("OPS_CONNECT_S", "3"))
+_SESSION = requests.Session()
+_retry = Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.2)
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_retry))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_retry))
 
 # ---------- HMAC helpers ----------
 
@@ -35,29 +47,50 @@ def _load_secret_from_env() -> bytes:
     return s.encode("utf-8")
 
 def hmac_hex(secret: bytes, data: bytes) -> str:
-    return hmac.new(secret, data, hashlib.sha256).hexdigest()
+    # One-shot C path: no HMAC object, no Python-level key padding.
+    return hmac.digest(secret, data, "sha256").hex()
 
 def _trial_signatures(secret: bytes, raw_json: bytes, ts: str):
-    """Yield (label, headers) for the various signing schemes."""
-    body_str = raw_json.decode()
-    
+    """Yield (label, headers) for the various signing schemes.
+
+    Lazy: the fallback signatures are only computed if the caller asks for the
+    next trial, i.e. after the primary was rejected (401/403).
+
+    The same headers dict is yielded each time with only the signature values
+    swapped; requests reads it synchronously, so callers that keep it past the
+    next trial must copy it.
+    """
+    ts_b = ts.encode()
+    headers = {
+        "Content-Type": "application/json",
+        "X-Timestamp": ts,
+        "X-Nova-Signature": "",    # Modern header
+        "X-Outbox-Signature": "",  # Legacy backup
+        "X-Signature": "",         # Legacy backup
+    }
+
+    def _with(sig: str) -> Dict[str, str]:
+        headers["X-Nova-Signature"] = headers["X-Outbox-Signature"] = headers["X-Signature"] = sig
+        return headers
+
     # PRIMARY: Payload only (Canonical) - Matches wsgi.py _verify_sorted
-    sig_body = hmac_hex(secret, raw_json)
-    
-    trials = [
-        ("body", sig_body),
-        ("ts+body", hmac_hex(secret, (ts + body_str).encode())),
-        ("body+ts", hmac_hex(secret, (body_str + ts).encode())),
-    ]
-    
-    for label, sig in trials:
-        yield label, {
-            "Content-Type": "application/json",
-            "X-Timestamp": ts,
-            "X-Nova-Signature": sig,    # Modern header
-            "X-Outbox-Signature": sig,  # Legacy backup
-            "X-Signature": sig,         # Legacy backup
-        }
+    # "body+ts" extends the same message, so hash the body once and fork the state.
+    h_body = hmac.new(secret, raw_json, hashlib.sha256)
+    yield "body", _with(h_body.copy().hexdigest())
+
+    # Feed ts then body into the HMAC rather than materializing ts_b + raw_json.
+    h_ts = hmac.new(secret, ts_b, hashlib.sha256)
+    h_ts.update(raw_json)
+    yield "ts+body", _with(h_ts.hexdigest())
+
+    h_body.update(ts_b)
+    yield "body+ts", _with(h_body.hexdigest())
+
+def _json_body(r) -> Dict[str, Any]:
+    try:
+        return r.json()
+    except Exception:
+        return {"raw": r.text}
 
 def _attempt_raw(
     url: str,
@@ -71,42 +104,39 @@ def _attempt_raw(
     
     # CRITICAL FIX: sort_keys=True ensures we send the exact same byte sequence
     # that the Bus expects for its "Canonical" verification.
-    raw_json = json.dumps(
-        body_dict, 
-        separators=(",", ":"), 
-        sort_keys=True, 
-        ensure_ascii=False
-    ).encode()
+    # Serialized exactly once: every signing trial and every POST reuse raw_json.
+    raw_json = canonical_bytes(body_dict, ensure_ascii=False)
     
     ts = str(int(time.time()))
     last_status: Optional[int] = None
     last_body: Optional[Dict[str, Any]] = None
+    last_resp = None
 
     for label, headers in _trial_signatures(secret, raw_json, ts):
         try:
-            r = requests.post(url, data=raw_json, headers=headers, timeout=timeout)
+            r = _SESSION.post(url, data=raw_json, headers=headers, timeout=(CONNECT_S, timeout))
             last_status = r.status_code
-            try:
-                last_body = r.json()
-            except Exception:
-                last_body = {"raw": r.text}
-            
+            last_resp, last_body = r, None
+
             if verbose:
-                print(f"[{label}] status={r.status_code} body={last_body}")
+                # log the raw text; the body is only JSON-decoded when it's returned
+                print(f"[{label}] status={r.status_code} body={r.text}")
             
             # 200-299 = Success
             if 200 <= r.status_code < 300:
-                return True, label, last_body, last_status
+                return True, label, _json_body(r), last_status
             # 401/403 = Auth failed, loop might try next sig format
             # 400/500 = Logic/Server error, likely definitive
             if r.status_code >= 400 and r.status_code != 401 and r.status_code != 403:
-                 return False, label, last_body, last_status
+                 return False, label, _json_body(r), last_status
 
         except Exception as e:
             if verbose:
                 print(f"[{label}] request failed: {e}")
-            last_body = {"error": str(e)}
+            last_resp, last_body = None, {"error": str(e)}
 
+    if last_resp is not None:
+        last_body = _json_body(last_resp)
     return False, "all_failed", last_body, last_status
 
 # ---------- Envelope → payload ----------
@@ -200,7 +230,7 @@ def main():
     ap.add_argument("--venue", required=True)
     ap.add_argument("--symbol", required=True)
     ap.add_argument("--side", required=True, choices=["BUY", "SELL"])
-    ap.add_argument("--amount", required=True)
+    ap.add_argument("--amount", "--quote", dest="amount", required=True, help="Quote amount to spend")
     ap.add_argument("--tif", default="IOC")
     args = ap.parse_args()
 
@@ -1,8 +1,8 @@
-import os, pandas as pd
+import os
 from dotenv import load_dotenv
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import plotly.graph_objects as go
+
+# pandas/numpy/plotly/gspread are imported where they're used, so importing
+# this module stays cheap for processes that never build the dashboard.
 
 load_dotenv()
 
@@ -10,12 +10,22 @@ SHEET_URL = os.getenv("SHEET_URL","").strip()
 CREDS_FILE = os.getenv("GOOGLE_CREDS_FILE","sentiment-log-service.json").strip()
 START_CAPITAL = float(os.getenv("START_CAPITAL","5000"))
 
+_CREDS = None
+_GC = None
+
 def _gclient():
-    scope = ['https://spreadsheets.google.com/feeds','https://www.googleapis.com/auth/drive']
-    creds = ServiceAccountCredentials.from_json_keyfile_name(CREDS_FILE, scope)
-    return gspread.authorize(creds)
+    # keyfile read + JWT sign once per token lifetime, not once per call
+    global _CREDS, _GC
+    if _GC is None or getattr(_CREDS, "access_token_expired", False):
+        import gspread
+        from oauth2client.service_account import ServiceAccountCredentials
+        scope = ['https://spreadsheets.google.com/feeds','https://www.googleapis.com/auth/drive']
+        _CREDS = ServiceAccountCredentials.from_json_keyfile_name(CREDS_FILE, scope)
+        _GC = gspread.authorize(_CREDS)
+    return _GC
 
 def _from_sheet():
+    import pandas as pd
     gc = _gclient()
     sh = gc.open_by_url(SHEET_URL)
     log = pd.DataFrame(sh.worksheet("Trade_Log").get_all_records())
@@ -23,6 +33,7 @@ def _from_sheet():
 
 def _demo():
     # tiny demo dataset
+    import pandas as pd
     return pd.DataFrame([
         {"Timestamp":"2025-01-01 00:00:00","Action":"BUY","Token":"ABC","usdt_value":100},
         {"Timestamp":"2025-01-05 00:00:00","Action":"SELL","Token":"ABC","usdt_value":120},
@@ -30,18 +41,29 @@ def _demo():
         {"Timestamp":"2025-02-20 00:00:00","Action":"SELL","Token":"XYZ","usdt_value":200},
     ])
 
-def build(df: pd.DataFrame, out_html="dashboard.html"):
+def build(df: "pd.DataFrame", out_html="dashboard.html"):
+    import numpy as np
+    import pandas as pd
+    import plotly.graph_objects as go
+
     if df.empty or "usdt_value" not in df.columns:
         df = _demo()
-    df["Timestamp"] = pd.to_datetime(df["Timestamp"])
+    # fixed format skips per-row format inference; fall back for hand-edited rows
+    try:
+        df["Timestamp"] = pd.to_datetime(df["Timestamp"], format="%Y-%m-%d %H:%M:%S", cache=True)
+    except (ValueError, TypeError):
+        df["Timestamp"] = pd.to_datetime(df["Timestamp"], cache=True)
     df = df.sort_values("Timestamp")
 
-    # naive equity curve using usdt_value sign by action
-    df["pnl"] = df.apply(lambda r: (r["usdt_value"] if str(r["Action"]).upper()=="SELL" else -float(r["usdt_value"])), axis=1)
+    # naive equity curve using usdt_value sign by action (vectorized, no per-row callback)
+    usd = pd.to_numeric(df["usdt_value"], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    is_sell = df["Action"].astype(str).str.upper().to_numpy() == "SELL"
+    df["pnl"] = np.where(is_sell, usd, -usd)
     df["equity"] = START_CAPITAL + df["pnl"].cumsum()
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df["Timestamp"], y=df["equity"], mode="lines+markers", name="Equity"))
+    fig.add_trace(go.Scatter(x=df["Timestamp"].to_numpy(), y=df["equity"].to_numpy(),
+                             mode="lines+markers", name="Equity"))
     fig.update_layout(title="Compound ROI Dashboard", xaxis_title="Time", yaxis_title="Equity (USDT)")
     fig.write_html(out_html, include_plotlyjs="cdn")
     print(f"Wrote {out_html}")
@@ -50,5 +72,6 @@ if __name__=="__main__":
     try:
         df = _from_sheet()
     except Exception:
+        import pandas as pd
         df = pd.DataFrame()
     build(df)
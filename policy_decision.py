@@ -14,10 +14,22 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
-import uuid
+import secrets
 
 
-@dataclass
+# Optional metadata, in output order; empty ones are left out of "meta".
+_META_FIELDS = (
+    "source",
+    "venue",
+    "symbol",
+    "base",
+    "quote",
+    "requested_amount_usd",
+    "approved_amount_usd",
+)
+
+
+@dataclass(slots=True)
 class PolicyDecision:
     ok: bool
     status: str
@@ -26,7 +38,7 @@ class PolicyDecision:
     patched: Dict[str, Any]
 
     # Metadata
-    decision_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    decision_id: str = field(default_factory=lambda: secrets.token_hex(16))
     created_at: str = field(
         default_factory=lambda: datetime.now(timezone.utc).isoformat()
     )
@@ -53,23 +65,13 @@ class PolicyDecision:
             "created_at": self.created_at,
         }
 
-        meta = {
-            "source": self.source,
-            "venue": self.venue,
-            "symbol": self.symbol,
-            "base": self.base,
-            "quote": self.quote,
-            "requested_amount_usd": self.requested_amount_usd,
-            "approved_amount_usd": self.approved_amount_usd,
-        }
-
-        # Only include non-empty meta entries
-        meta_clean = {
-            k: v
-            for k, v in meta.items()
-            if v is not None and v != ""  # allow 0.0 for amounts
-        }
-        if meta_clean:
-            base["meta"] = meta_clean
+        # Only include non-empty meta entries; "meta" is created on first hit
+        meta = None
+        for k in _META_FIELDS:
+            v = getattr(self, k)
+            if v is not None and v != "":  # allow 0.0 for amounts
+                if meta is None:
+                    meta = base["meta"] = {}
+                meta[k] = v
 
         return base
@@ -2,7 +2,68 @@
 from __future__ import annotations
 # pollers/kraken_poll.py
 import time
-from typing import Optional, Dict, Any
+import inspect
+from typing import Optional, Dict, Any, Tuple
+
+_QUERY_METHODS = ('query_orders', 'get_order', 'fetch_order', 'order')
+
+# type(api) -> (method name, kwarg name); resolved once so retries make one direct call
+_KRAKEN_METHOD_CACHE: Dict[type, Tuple[str, str]] = {}
+
+def _resolve_query(api) -> Optional[Tuple[str, str]]:
+    for name in _QUERY_METHODS:
+        fn = getattr(api, name, None)
+        if not callable(fn):
+            continue
+        try:
+            params = inspect.signature(fn).parameters
+        except (TypeError, ValueError):
+            return None  # not introspectable; use the probe
+        if 'userref' in params or any(p.kind is p.VAR_KEYWORD for p in params.values()):
+            return name, 'userref'
+        if 'client_id' in params:
+            return name, 'client_id'
+    return None
+
+def _probe_query(api, client_id: str):
+    data = None
+    for name in _QUERY_METHODS:
+        fn = getattr(api, name, None)
+        if not callable(fn):
+            continue
+        try:
+            data = fn(userref=client_id)  # type: ignore
+        except TypeError:
+            try:
+                data = fn(client_id=client_id)  # type: ignore
+            except Exception:
+                data = None
+        except Exception:
+            data = None
+        if data:
+            break
+    return data
+
+def _parse_fill(f) -> Tuple[float, float]:
+    try:
+        return float(f.get('price') or 0.0), float(f.get('qty') or f.get('vol') or 0.0)
+    except Exception:
+        return 0.0, 0.0
+
+def _query_order(api, client_id: str):
+    key = type(api)
+    hit = _KRAKEN_METHOD_CACHE.get(key)
+    if hit is None:
+        hit = _resolve_query(api)
+        if hit is not None:
+            _KRAKEN_METHOD_CACHE[key] = hit
+    if hit is not None:
+        name, kw = hit
+        try:
+            return getattr(api, name)(**{kw: client_id})
+        except Exception:
+            _KRAKEN_METHOD_CACHE.pop(key, None)
+    return _probe_query(api, client_id)
 
 def poll_kraken(client_id: str, venue_symbol: str, wait_sec: int = 2, max_retry: int = 3) -> Optional[Dict[str, Any]]:
     try:
@@ -23,28 +84,10 @@ def poll_kraken(client_id: str, venue_symbol: str, wait_sec: int = 2, max_retry:
             time.sleep(wait_sec)
         tries += 1
 
-        data = None
-        for name in ('query_orders','get_order','fetch_order','order'):
-            fn = getattr(api, name, None)
-            if not callable(fn):
-                continue
-            try:
-                data = fn(userref=client_id)  # type: ignore
-            except TypeError:
-                try:
-                    data = fn(client_id=client_id)  # type: ignore
-                except Exception:
-                    data = None
-            except Exception:
-                data = None
-            if data:
-                break
+        data = _query_order(api, client_id)
         if not data:
             continue
 
-        fills = []
-        total_qty = 0.0
-        notional  = 0.0
         order = None
         try:
             res = data.get('result') or {}
@@ -63,16 +106,15 @@ def poll_kraken(client_id: str, venue_symbol: str, wait_sec: int = 2, max_retry:
         except Exception:
             pass
 
-        for f in (order.get('trades') or []):
-            try:
-                px = float(f.get('price') or 0.0)
-                q  = float(f.get('qty') or f.get('vol') or 0.0)
-                if px and q:
-                    fills.append({'qty': q, 'price': px})
-                    total_qty += q
-                    notional  += q*px
-            except Exception:
-                continue
+        fills = []
+        _append = fills.append
+        total_qty = 0.0
+        notional  = 0.0
+        for px, q in map(_parse_fill, order.get('trades') or ()):
+            if px and q:
+                _append({'qty': q, 'price': px})
+                total_qty += q
+                notional  += q*px
         if total_qty > 0 and notional > 0:
             return {'fills': fills, 'executed_qty': total_qty, 'avg_price': round(notional/total_qty,12), 'raw': order}
     return None
@@ -1,31 +1,42 @@
 # presale_auto_buy.py
 
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from mexc_executor import execute_buy
 import os
 from datetime import datetime
 
+def _cell(row, col, name):
+    # raw value rows omit trailing blanks, so guard the index
+    i = col.get(name)
+    return row[i] if i is not None and i < len(row) else ""
+
 def run_presale_auto_buy():
     print("🤖 Checking for presale YES votes to auto-buy...")
     
-    # Auth
+    # Auth (gspread/oauth2client imported lazily; only the scan needs them)
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
     scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
     creds = ServiceAccountCredentials.from_json_keyfile_name("sentiment-log-service.json", scope)
     client = gspread.authorize(creds)
     sheet = client.open_by_url(os.getenv("SHEET_URL"))
-    planner_ws = sheet.worksheet("Rotation_Planner")
-    trade_log_ws = sheet.worksheet("Trade_Log")
-    
-    planner = planner_ws.get_all_records()
-    trade_log = trade_log_ws.get_all_records()
 
-    traded_tokens = {row["Token"].strip().upper() for row in trade_log if row.get("Action") == "BUY"}
+    # Both tabs in one round-trip, as raw rows (no per-row dicts)
+    res = sheet.values_batch_get(["Rotation_Planner", "Trade_Log"])
+    vr = res.get("valueRanges") or [{}, {}]
+    planner, trade_log = vr[0].get("values", []), vr[1].get("values", [])
+    p_col = {c.strip(): i for i, c in enumerate(planner[0])} if planner else {}
+    t_col = {c.strip(): i for i, c in enumerate(trade_log[0])} if trade_log else {}
+
+    traded_tokens = set(
+        _cell(row, t_col, "Token").strip().upper()
+        for row in trade_log[1:] if _cell(row, t_col, "Action") == "BUY"
+    )
+    del trade_log  # only the token set is needed from here on
 
-    for i, row in enumerate(planner, start=2):
-        token = row.get("Token", "").strip()
-        confirmed = str(row.get("Confirmed", "")).strip().upper()
-        source = str(row.get("Source", "")).strip()
+    for row in planner[1:]:
+        token = _cell(row, p_col, "Token").strip()
+        confirmed = _cell(row, p_col, "Confirmed").strip().upper()
+        source = _cell(row, p_col, "Source").strip()
         
         if (
             confirmed == "YES"
@@ -1,6 +1,7 @@
 import os, sys, time
 from pathlib import Path
-from github import Github
+from github import Github, GithubException
+from urllib3.util.retry import Retry
 
 # Usage: python publish_release.py <tag> <path_to_zip>
 # Example: python publish_release.py v2025-08-21 NovaTrade_Phase17_18_Pack_2025-08-21_v2.zip
@@ -11,17 +12,20 @@ NAME  = ZIP.name
 TOKEN = os.environ["GITHUB_TOKEN"]
 REPO  = os.environ["GITHUB_REPO"]  # e.g. yourname/NovaTrade-Builds
 
-g = Github(TOKEN)
+# retry transient 5xx on the same keep-alive connection instead of failing the upload
+g = Github(TOKEN, per_page=100,
+           retry=Retry(total=3, backoff_factor=1, status_forcelist=(502, 503, 504)))
 repo = g.get_repo(REPO)
 
 # Create (or reuse) release
 try:
     rel = repo.get_release(TAG)
-except:
+except GithubException as e:
+    if e.status != 404:
+        raise  # auth / rate-limit errors: fail fast rather than also trying to create
     rel = repo.create_git_release(TAG, f"Build {TAG}", "Automated build upload", draft=False, prerelease=False)
 
-# Upload asset
-with open(ZIP, "rb") as f:
-    rel.upload_asset_from_memory(f.read(), NAME, content_type="application/zip")
+# Upload asset (streamed from disk; the zip is never held in memory)
+rel.upload_asset(path=str(ZIP), name=NAME, content_type="application/zip")
 
 print(f"✅ Uploaded {NAME} to release {TAG}")
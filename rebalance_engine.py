@@ -1,24 +1,62 @@
 # rebalance_engine.py  (LOCAL VPN EXECUTOR)
 import os, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Tuple
 
 # ==== Telegram notify ====
-def send_telegram(text: str):
+_TG_SESSION = None
+
+def _tg_session():
+    # Built on first notify so importing this module doesn't pull in requests;
+    # later rebalance ticks reuse the same TLS connection to api.telegram.org.
+    global _TG_SESSION
+    if _TG_SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        s = requests.Session()
+        s.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4,
+                                        max_retries=Retry(total=2, backoff_factor=0.2,
+                                                          status_forcelist=(502, 503, 504))))
+        _TG_SESSION = s
+    return _TG_SESSION
+
+def _send_telegram_now(text: str):
     try:
         token = os.getenv("TELEGRAM_BOT_TOKEN") or os.getenv("BOT_TOKEN")
         chat  = os.getenv("TELEGRAM_CHAT_ID")  or os.getenv("CHAT_ID")
         if not token or not chat:
             print("ℹ️ Telegram creds missing; skip notify.")
             return
-        import requests
-        r = requests.post(f"https://api.telegram.org/bot{token}/sendMessage",
-                          json={"chat_id": chat, "text": text, "parse_mode": "Markdown"},
-                          timeout=10)
+        r = _tg_session().post(f"https://api.telegram.org/bot{token}/sendMessage",
+                               json={"chat_id": chat, "text": text, "parse_mode": "Markdown"},
+                               timeout=(3, 10))
         if r.status_code != 200:
             print(f"⚠️ Telegram send failed: {r.status_code} {r.text}")
     except Exception as e:
         print(f"⚠️ Telegram send error: {e}")
 
+# Notifications are observational: hand them to a small worker pool so a slow
+# api.telegram.org never stalls the trade loop. The backlog is bounded; during
+# an outage the oldest unsent alerts are dropped first.
+_TG_QUEUE: deque = deque(maxlen=int(os.getenv("TELEGRAM_QUEUE_MAX", "50")))
+_TG_POOL = None
+
+def _tg_drain():
+    try:
+        text = _TG_QUEUE.popleft()
+    except IndexError:
+        return  # already sent by another worker, or dropped on overflow
+    _send_telegram_now(text)
+
+def send_telegram(text: str):
+    global _TG_POOL
+    if _TG_POOL is None:
+        _TG_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tg")
+    _TG_QUEUE.append(text)
+    _TG_POOL.submit(_tg_drain)
+
 # ==== Exchange executor hooks (replace with your real ones if available) ====
 def execute_buy(symbol: str, qty: float) -> Dict[str, Any]:
     """
@@ -41,12 +79,14 @@ def read_target_weights() -> Dict[str, float]:
     # e.g., {"MIND": 5.0, "OZAKAI": 3.0, ...} from Portfolio_Targets
     raise NotImplementedError
 
+try:
+    _EQUITY_FALLBACK = float(os.getenv("PORTFOLIO_EQUITY_FALLBACK_USD","5000"))
+except:
+    _EQUITY_FALLBACK = 5000.0
+
 def read_equity_usd() -> float:
     # return current portfolio equity in USD (from sheet or local calc)
-    try:
-        return float(os.getenv("PORTFOLIO_EQUITY_FALLBACK_USD","5000"))
-    except:
-        return 5000.0
+    return _EQUITY_FALLBACK
 
 def log_trade(symbol: str, side: str, usd: float, note: str = "Auto‑Rebalance"):
     # append to Trade_Log; safe no‑op if not implemented
@@ -61,15 +101,14 @@ REBALANCE_BAND_PCT = float(os.getenv("REBALANCE_BAND_PCT", "20"))  # act if >20%
 MIN_TRADE_USD      = float(os.getenv("MIN_TRADE_USD", "25"))
 MAX_TRADE_USD      = float(os.getenv("MAX_TRADE_USD", "500"))
 COOLDOWN_MIN       = int(os.getenv("REBALANCE_COOLDOWN_MIN", "60"))
+_SCAN_SEC          = int(os.getenv("REBALANCE_SCAN_SEC", "900"))  # default 15m
+# All tunables are read once at import; changing them requires a restart.
 
+# symbol -> time.monotonic() of last trade; immune to wall-clock (NTP) jumps
 _last_trade_ts: Dict[str, float] = {}
 
-def _cooldown_ok(symbol: str) -> bool:
-    ts = _last_trade_ts.get(symbol, 0)
-    return time.time() - ts >= COOLDOWN_MIN * 60
-
-def _mark_trade(symbol: str):
-    _last_trade_ts[symbol] = time.time()
+def _mark_trade(symbol: str, now: float):
+    _last_trade_ts[symbol] = now
 
 def _format_alert(symbol: str, side: str, delta_pct: float, usd: float) -> str:
     return (
@@ -84,12 +123,8 @@ def _format_alert(symbol: str, side: str, delta_pct: float, usd: float) -> str:
 def _clamp_amount(usd: float) -> float:
     return max(MIN_TRADE_USD, min(MAX_TRADE_USD, usd))
 
-def _calc_deviation(cur: float, tgt: float) -> float:
-    if tgt is None or tgt == 0:
-        return 0.0
-    return (cur - tgt) / tgt * 100.0
-
 def run_rebalance_once():
+    now = time.monotonic()  # one clock read per scan
     equity = read_equity_usd()
     try:
         current = read_current_weights()
@@ -98,16 +133,25 @@ def run_rebalance_once():
         print("⚠️ read_current_weights/read_target_weights not implemented; skipping.")
         return
 
-    acted = 0
+    # Loop invariants as locals
+    band = REBALANCE_BAND_PCT
+    cd = COOLDOWN_MIN * 60
+    last = _last_trade_ts
+
+    # (deviation % vs target, symbol, current, target); only those outside the band
+    out_of_band = []
     for sym, tgt_w in target.items():
         cur_w = current.get(sym, 0.0)
-        delta = _calc_deviation(cur_w, tgt_w)
+        delta = 0.0 if not tgt_w else (cur_w - tgt_w) / tgt_w * 100.0
+        if abs(delta) >= band:
+            out_of_band.append((delta, sym, cur_w, tgt_w))
+    # Most-deviating positions first
+    out_of_band.sort(key=lambda t: abs(t[0]), reverse=True)
 
-        # Only act if outside band
-        band = abs(delta) >= REBALANCE_BAND_PCT
-        if not band:
-            continue
-        if not _cooldown_ok(sym):
+    acted = 0
+    for delta, sym, cur_w, tgt_w in out_of_band:
+        ts = last.get(sym)
+        if ts is not None and now - ts < cd:
             print(f"⏳ Skip {sym}: cooldown.")
             continue
 
@@ -122,7 +166,7 @@ def run_rebalance_once():
                 execute_sell(sym, usd)  # your executor may expect qty instead of USD
             else:
                 execute_buy(sym, usd)
-            _mark_trade(sym)
+            _mark_trade(sym, now)
             log_trade(sym, side, usd, "Auto‑Rebalance")
             send_telegram(_format_alert(sym, side, delta, usd))
             acted += 1
@@ -136,5 +180,7 @@ def run_rebalance_once():
 
 def run_rebalance_loop():
     while True:
+        start = time.monotonic()
         run_rebalance_once()
-        time.sleep(int(os.getenv("REBALANCE_SCAN_SEC","900")))  # default 15m
+        # subtract scan time so the tick cadence holds under slow I/O
+        time.sleep(max(0.0, _SCAN_SEC - (time.monotonic() - start)))
@@ -1,15 +1,19 @@
 # rebalance_handler.py
 
-import gspread
 import os
 import time
 from datetime import datetime
-from oauth2client.service_account import ServiceAccountCredentials
 from mexc_executor import execute_sell
 
+def _cell(row, col, name):
+    i = col.get(name)
+    return row[i] if i is not None and i < len(row) else ""
+
 def run_rebalance_handler():
     print("🔁 Rebalance Handler active...")
     
+    import gspread  # lazy: only the handler run needs the Sheets stack
+    from oauth2client.service_account import ServiceAccountCredentials
     scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
     creds = ServiceAccountCredentials.from_json_keyfile_name("sentiment-log-service.json", scope)
     client = gspread.authorize(creds)
@@ -18,30 +22,39 @@ def run_rebalance_handler():
     planner_ws = sheet.worksheet("Rotation_Planner")
     log_ws = sheet.worksheet("Trade_Log")
 
-    planner_data = planner_ws.get_all_records()
-    executed = log_ws.get_all_records()
-
-    for i, row in enumerate(planner_data, start=2):
-        token = row.get("Token", "").strip()
-        response = str(row.get("User Response", "")).strip().upper()
-        source = str(row.get("Source", "")).strip()
-        confirmed = str(row.get("Confirmed", "")).strip().upper()
-
-        if response == "YES" and source == "Rebalance_Overweight" and confirmed != "EXECUTED":
-            print(f"📉 Executing rebalance SELL for {token}...")
-
-            try:
-                execute_sell(token)  # Sell 100% of position
-                planner_ws.update_acell(f"D{i}", "EXECUTED")
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-                log_ws.append_row([
-                    timestamp, token, "SELL", "Rebalance_Overweight", "Auto", "100%", "", "", ""
-                ])
-                print(f"✅ {token} sell logged to Trade_Log.")
-            except Exception as e:
-                print(f"❌ Sell failed for {token}: {e}")
-
-            time.sleep(2)
+    values = planner_ws.get_all_values()
+    col = {c.strip(): i for i, c in enumerate(values[0])} if values else {}
+
+    # EXECUTED is written as soon as each sell goes through, so a crash mid-scan
+    # can't repeat it next cycle. Trade_Log rows go out in one append_rows,
+    # flushed even if the scan stops early.
+    pending_log_rows = []
+
+    try:
+        for i, row in enumerate(values[1:], start=2):
+            token = _cell(row, col, "Token").strip()
+            response = _cell(row, col, "User Response").strip().upper()
+            source = _cell(row, col, "Source").strip()
+            confirmed = _cell(row, col, "Confirmed").strip().upper()
+
+            if response == "YES" and source == "Rebalance_Overweight" and confirmed != "EXECUTED":
+                print(f"📉 Executing rebalance SELL for {token}...")
+
+                try:
+                    execute_sell(token)  # Sell 100% of position
+                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    pending_log_rows.append([
+                        timestamp, token, "SELL", "Rebalance_Overweight", "Auto", "100%", "", "", ""
+                    ])
+                    planner_ws.update_acell(f"D{i}", "EXECUTED")
+                    print(f"✅ {token} sell queued for Trade_Log.")
+                except Exception as e:
+                    print(f"❌ Sell failed for {token}: {e}")
+
+                time.sleep(2)
+    finally:
+        if pending_log_rows:
+            log_ws.append_rows(pending_log_rows)
+            print(f"✅ {len(pending_log_rows)} sell(s) logged to Trade_Log.")
 
     print("✅ Rebalance Handler scan complete.")
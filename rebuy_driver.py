@@ -2,6 +2,8 @@
 # Pulls commands, Execs (Stub), Acks with Canonical HMAC.
 
 import os, time, requests, json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import hmac_utils
 
 # Config
@@ -10,14 +12,25 @@ PULL_URL = f"{BUS_BASE}/api/commands/pull"
 ACK_URL  = f"{BUS_BASE}/api/commands/ack"
 SECRET   = os.getenv("OUTBOX_SECRET") or ""
 AGENT_ID = os.getenv("AGENT_ID", "edge-primary")
+# Idle polling backs off from POLL_BASE_S up to POLL_MAX_S; busy polls repoll after 1s
+POLL_BASE_S = float(os.getenv("POLL_BASE_S", "5"))
+POLL_MAX_S  = float(os.getenv("POLL_MAX_S", "60"))
+# (connect, read): a stalled connect fails fast without shortening the read budget
+TIMEOUT  = (float(os.getenv("BUS_CONNECT_S", "3")), 10.0)
+
+# Keep-alive pool so pull/ack reuse one TLS connection to the Bus across polls
+_SESSION = requests.Session()
+_retry = Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+               allowed_methods=frozenset(["POST"]))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_retry))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_retry))
 
 def pull_commands():
     payload = {"agent_id": AGENT_ID, "limit": 5}
-    # Sign Pull Request
-    headers = hmac_utils.get_auth_headers(payload, SECRET)
+    # Sign Pull Request (body serialized once; the signed bytes are what's sent)
     try:
-        body = hmac_utils.canonical_bytes(payload)
-        r = requests.post(PULL_URL, data=body, headers=headers, timeout=10)
+        body, headers = hmac_utils.signed_request(payload, SECRET)
+        r = _SESSION.post(PULL_URL, data=body, headers=headers, timeout=TIMEOUT)
         if r.ok:
             return r.json().get("commands", [])
         return []
@@ -33,10 +46,9 @@ def ack_command(cmd_id, status, receipt):
         "receipt": receipt
     }
     # Sign Ack Request
-    headers = hmac_utils.get_auth_headers(payload, SECRET)
     try:
-        body = hmac_utils.canonical_bytes(payload)
-        requests.post(ACK_URL, data=body, headers=headers, timeout=10)
+        body, headers = hmac_utils.signed_request(payload, SECRET)
+        _SESSION.post(ACK_URL, data=body, headers=headers, timeout=TIMEOUT)
         print(f"[Driver] Ack Sent: {cmd_id} -> {status}")
     except Exception as e:
         print(f"[Driver] Ack Error: {e}")
@@ -48,6 +60,7 @@ def execute_stub(cmd):
 
 def run_loop():
     print(f"Starting Rebuy Driver | Agent: {AGENT_ID}")
+    sleep_s = POLL_BASE_S
     while True:
         cmds = pull_commands()
         for c in cmds:
@@ -60,8 +73,13 @@ def run_loop():
             
             # Ack
             ack_command(cid, status, receipt)
-            
-        time.sleep(5)
+
+        # more work is likely right after a non-empty pull; back off while idle
+        if cmds:
+            sleep_s = 1.0
+        else:
+            sleep_s = min(POLL_MAX_S, max(POLL_BASE_S, sleep_s * 2))
+        time.sleep(sleep_s)
 
 if __name__ == "__main__":
     run_loop()
@@ -1,13 +1,13 @@
 # rebuy_engine.py
 
 import os
-import gspread
 from datetime import datetime
-from oauth2client.service_account import ServiceAccountCredentials
 from mexc_executor import execute_buy, get_usdt_balance
 
 def run_undersized_rebuy():
     print("📉 Checking for undersized positions...")
+    import gspread  # lazy: only the rebuy scan needs the Sheets stack
+    from oauth2client.service_account import ServiceAccountCredentials
     scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
     creds = ServiceAccountCredentials.from_json_keyfile_name("sentiment-log-service.json", scope)
     client = gspread.authorize(creds)
@@ -21,22 +21,25 @@ def run_undersized_rebuy():
 
     token_to_actual = {}
     for row in holdings:
-        token = row["Token"]
-        alloc = row["Allocation"].replace("%", "").strip()
+        alloc = str(row.get("Allocation", "")).strip().rstrip("% ")
+        if not alloc:
+            continue
         try:
-            token_to_actual[token.upper()] = float(alloc)
-        except:
+            token_to_actual[str(row["Token"]).upper()] = float(alloc)
+        except ValueError:
             continue
 
+    # One pass: drift per token and the running total used for proportions
     drift_tokens = []
+    total_drift = 0.0
     for row in targets:
         token = row["Token"].strip().upper()
         target_pct = float(row.get("Target %", 0))
-        actual_pct = token_to_actual.get(token, 0.0)
-        drift = round(target_pct - actual_pct, 2)
+        drift = round(target_pct - token_to_actual.get(token, 0.0), 2)
 
         if drift > 1.0:
             drift_tokens.append((token, drift))
+            total_drift += drift
 
     if not drift_tokens:
         print("✅ No undersized tokens found.")
@@ -48,7 +51,6 @@ def run_undersized_rebuy():
         return
 
     # Allocate USDT proportionally based on drift
-    total_drift = sum(d[1] for d in drift_tokens)
     for token, drift in drift_tokens:
         portion = drift / total_drift
         buy_amount = round(usdt_balance * portion, 2)
@@ -1,15 +1,24 @@
 # Placeholder: scans optional 'Rebuy_Queue' sheet if present and calls mexc_executor.execute_buy
-import gspread, time
-from oauth2client.service_account import ServiceAccountCredentials
+import time
 from config import SHEET_URL, CREDS_FILE, DEFAULT_BUY_USDT
 from mexc_executor import execute_buy
 
+_CREDS = None
+_GC = None
+
 def _gclient():
-    scope = ['https://spreadsheets.google.com/feeds','https://www.googleapis.com/auth/drive']
-    creds = ServiceAccountCredentials.from_json_keyfile_name(CREDS_FILE, scope)
-    return gspread.authorize(creds)
+    # keyfile read + JWT sign once per token lifetime, not once per run_rebuy_once()
+    global _CREDS, _GC
+    if _GC is None or getattr(_CREDS, "access_token_expired", False):
+        import gspread  # lazy: only paid when the queue is actually scanned
+        from oauth2client.service_account import ServiceAccountCredentials
+        scope = ['https://spreadsheets.google.com/feeds','https://www.googleapis.com/auth/drive']
+        _CREDS = ServiceAccountCredentials.from_json_keyfile_name(CREDS_FILE, scope)
+        _GC = gspread.authorize(_CREDS)
+    return _GC
 
 def run_rebuy_once():
+    from gspread.utils import rowcol_to_a1
     gc = _gclient()
     sh = gc.open_by_url(SHEET_URL)
     try:
@@ -22,13 +31,24 @@ def run_rebuy_once():
         return 0
     rows = ws.get_all_values()[1:]
     acted = 0
-    for i, r in enumerate(rows, start=2):
-        if (r[header["Status"]-1] or "").upper() == "DONE":
-            continue
-        token = r[header["Token"]-1].strip()
-        if not token:
-            continue
-        res = execute_buy(token, DEFAULT_BUY_USDT)
-        ws.update_cell(i, header["Status"], "DONE" if res else "FAILED")
-        acted += 1 if res else 0
+    # DONE is what stops a row being bought again, so it is written before the
+    # next buy. FAILED rows are retried regardless; those marks are batched and
+    # flushed even if the scan stops early.
+    failed = []
+    try:
+        for i, r in enumerate(rows, start=2):
+            if (r[header["Status"]-1] or "").upper() == "DONE":
+                continue
+            token = r[header["Token"]-1].strip()
+            if not token:
+                continue
+            res = execute_buy(token, DEFAULT_BUY_USDT)
+            if res:
+                ws.update_cell(i, header["Status"], "DONE")
+                acted += 1
+            else:
+                failed.append({"range": rowcol_to_a1(i, header["Status"]), "values": [["FAILED"]]})
+    finally:
+        if failed:
+            ws.batch_update(failed)
     return acted
@@ -39,12 +39,27 @@ Environment variables (Edge):
   - TIMEOUT_S       (optional) default 20
   - RETRIES         (optional) default 3
   - BACKOFF_S       (optional) base backoff seconds, default 0.5
+  - CONNECT_S       (optional) connect timeout seconds, default 3
+  - RECEIPT_SIG_FORMAT (optional) "hex" (default) or "b64"; b64 sends
+                    X-Nova-Signature: b64,<base64url sig> and needs Bus support
 """
 
 from __future__ import annotations
-import os, time, json, hmac, hashlib, math
-from typing import Any, Dict, Optional, Mapping
+import os, time, hmac, hashlib, math, base64, logging
+from typing import Any, Dict, Optional, Mapping, Tuple
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import ReadTimeoutError
+
+from hmac_utils import canonical_bytes
+
+try:
+    import orjson
+    _loads = orjson.loads
+except Exception:  # pragma: no cover
+    import json
+    _loads = json.loads
 
 # ---------- Env & Defaults ----------
 CLOUD_BASE_URL = (os.getenv("CLOUD_BASE_URL") or "").rstrip("/")
@@ -54,21 +69,55 @@ RECEIPTS_PATH  = os.getenv("RECEIPTS_PATH") or "/api/receipts/ack"
 TIMEOUT_S      = float(os.getenv("TIMEOUT_S") or "20")
 RETRIES        = int(os.getenv("RETRIES") or "3")
 BACKOFF_S      = float(os.getenv("BACKOFF_S") or "0.5")
+CONNECT_S      = float(os.getenv("CONNECT_S") or "3")
+SIG_FORMAT     = (os.getenv("RECEIPT_SIG_FORMAT") or "hex").lower()
 MAX_BODY_BYTES = 64 * 1024  # 64 KiB cap for safety
+_EDGE_SECRET_B = EDGE_SECRET.encode("utf-8")  # fixed per process; encode once
+
+# Keep-alive pool to the Bus. Transient failures (5xx, connect/read errors) are
+# retried by the adapter: RETRIES attempts in total, BACKOFF_S * 2**(n-1) apart,
+# honouring Retry-After. The final response is returned rather than raised.
+_retry = Retry(
+    total=max(0, RETRIES - 1),
+    backoff_factor=max(0.0, BACKOFF_S),
+    status_forcelist=frozenset(range(500, 600)),
+    allowed_methods=frozenset(["POST"]),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+_SESSION = requests.Session()
+_SESSION.headers.update({"Content-Type": "application/json"})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_retry))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_retry))
 
-# ---------- Simple logger ----------
-def _log(msg: str) -> None:
-    ts = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
-    print(f"[receipt_bus] {ts}Z {msg}", flush=True)
+# ---------- Logger ----------
+# Lazy %-style args: nothing is formatted unless a handler accepts the record.
+# Handlers are the host's business (edge_agent configures them); the CLI below
+# sets up its own.
+_LOG = logging.getLogger("receipt_bus")
 
 # ---------- HMAC helpers ----------
-def _hmac_hex(secret: str, raw: bytes) -> str:
-    return hmac.new(secret.encode("utf-8"), raw, hashlib.sha256).hexdigest()
+# EDGE_SECRET is fixed per process: key the HMAC once (ipad/opad already
+# absorbed) and copy() it per receipt. An empty secret still builds; the
+# send path refuses to run without one via _validate_env().
+_HMAC_PROTO = hmac.new(_EDGE_SECRET_B, None, hashlib.sha256)
+
+def _hmac_digest(raw: bytes) -> bytes:
+    m = _HMAC_PROTO.copy()
+    m.update(raw)
+    return m.digest()
+
+def _hmac_hex(raw: bytes) -> str:
+    return _hmac_digest(raw).hex()
+
+def _hmac_b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(_hmac_digest(raw)).rstrip(b"=").decode("ascii")
 
 # ---------- Validation ----------
-_REQUIRED_NORMALIZED = (
+_REQUIRED_NORMALIZED = frozenset((
     "venue", "symbol", "side", "mode", "status", "order_id",
-)
+))
+_NUM_KEYS = ("base_filled", "quote_filled", "fee")
 
 def _validate_env() -> None:
     missing = []
@@ -79,6 +128,7 @@ def _validate_env() -> None:
         raise RuntimeError(f"Missing required env: {', '.join(missing)}")
 
 def _validate_payload(payload: Mapping[str, Any]) -> None:
+    """Schema check; also coerces normalized numerics to float in place."""
     if not isinstance(payload, Mapping):
         raise ValueError("payload must be a mapping")
     if "agent_id" not in payload or not payload["agent_id"]:
@@ -88,17 +138,19 @@ def _validate_payload(payload: Mapping[str, Any]) -> None:
     if "normalized" not in payload or not isinstance(payload["normalized"], Mapping):
         raise ValueError("payload.normalized required")
     norm = payload["normalized"]
-    missing = [k for k in _REQUIRED_NORMALIZED if k not in norm]
+    missing = _REQUIRED_NORMALIZED - norm.keys()
     if missing:
-        raise ValueError(f"normalized missing keys: {', '.join(missing)}")
+        raise ValueError(f"normalized missing keys: {', '.join(sorted(missing))}")
 
-    # numeric sanity
-    for k in ("base_filled", "quote_filled", "fee"):
-        if k in norm and norm[k] is not None:
-            try:
-                float(norm[k])
-            except Exception:
-                raise ValueError(f"normalized.{k} must be numeric if present")
+    # numeric sanity + coercion in one pass (floats in outgoing JSON help the Bus writer)
+    for k in _NUM_KEYS:
+        v = norm.get(k)
+        if v is None:
+            continue
+        try:
+            norm[k] = float(v)
+        except (TypeError, ValueError):
+            raise ValueError(f"normalized.{k} must be numeric if present")
 
     # SELL/BUY consistency (soft check; Bus enforces too)
     side = str(norm.get("side", "")).upper()
@@ -109,28 +161,64 @@ def _validate_payload(payload: Mapping[str, Any]) -> None:
         # allow base_filled/quote_filled == 0 for open/partial
         pass
 
-def _coerce_numbers(norm: Dict[str, Any]) -> None:
-    # Make sure numerics are floats in outgoing JSON (helps the Bus writer)
-    for k in ("base_filled", "quote_filled", "fee"):
-        if k in norm and norm[k] is not None:
-            norm[k] = float(norm[k])
+# Oversized venue replies (usually error dumps) are cut to a safe subset before
+# serialization instead of being serialized in full only to trip MAX_BODY_BYTES.
+_RAW_MAX_KEYS = 50
+_RAW_KEEP = ("order_id", "orderId", "status", "reason", "code", "error", "msg", "message")
+_RAW_STR_MAX = 1024
+
+def _raw_too_big(raw: Mapping[str, Any]) -> bool:
+    # cheap upper-bound guess: key count + top-level sizes, no serialization
+    if len(raw) > _RAW_MAX_KEYS:
+        return True
+    budget = MAX_BODY_BYTES // 2
+    for v in raw.values():
+        if isinstance(v, (str, bytes)):
+            budget -= len(v)
+        elif isinstance(v, (dict, list, tuple)):
+            budget -= 64 * len(v)
+        if budget < 0:
+            return True
+    return False
+
+def _shrink_raw(raw: Mapping[str, Any]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"truncated": True}
+    for k in _RAW_KEEP:
+        v = raw.get(k)
+        if v is None:
+            continue
+        if isinstance(v, bytes):
+            v = v.decode("utf-8", "replace")
+        if isinstance(v, str):
+            out[k] = v[:_RAW_STR_MAX]
+        elif isinstance(v, (int, float, bool)):
+            out[k] = v
+        else:
+            out[k] = str(v)[:_RAW_STR_MAX]
+    return out
 
 # ---------- Core sender ----------
-def send_receipt(
-    *,
+def _sign_headers(raw_bytes: bytes, agent: str) -> Dict[str, str]:
+    if SIG_FORMAT == "b64":
+        # prefixed so the Bus can tell the formats apart during migration
+        sig = "b64," + _hmac_b64(raw_bytes)
+    else:
+        sig = _hmac_hex(raw_bytes)
+    return {  # Content-Type comes from the session defaults
+        "X-Nova-Signature": sig,
+        # Optional: stamp for server logs (no secrets)
+        "X-Nova-Agent": agent,
+    }
+
+def _prepare_receipt(
     cmd_id: str,
     normalized: Dict[str, Any],
-    raw: Optional[Dict[str, Any]] = None,
-    agent_id: Optional[str] = None,
-) -> Dict[str, Any]:
-    """
-    Send a single receipt to the Bus. Returns dict with {ok: bool, status: int, body: Any}.
-    Will retry on 5xx/timeout up to RETRIES.
-    """
-    _validate_env()
-
+    raw: Optional[Dict[str, Any]],
+    agent_id: Optional[str],
+) -> Tuple[bytes, Dict[str, str]]:
+    """Build, validate, serialize and sign one receipt -> (raw_bytes, headers)."""
     agent = agent_id or AGENT_ID
-    now_ms = int(time.time() * 1000)
+    now_ms = time.time_ns() // 1_000_000
 
     # Prepare body
     body: Dict[str, Any] = {
@@ -141,82 +229,92 @@ def send_receipt(
     }
     if raw:
         # Keep raw compact; avoid massive blobs
-        body["raw"] = raw
+        body["raw"] = _shrink_raw(raw) if isinstance(raw, Mapping) and _raw_too_big(raw) else raw
 
-    # Normalize/validate numbers and schema
-    _coerce_numbers(body["normalized"])
+    # Validate schema and coerce numbers to float
     _validate_payload(body)
 
-    # Deterministic JSON for HMAC (MUST match server verify)
-    body_sorted = json.dumps(body, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
-    raw_bytes   = body_sorted.encode("utf-8")
+    # Deterministic JSON for HMAC (MUST match server verify). Serialized once,
+    # straight to bytes; the same raw_bytes are signed and POSTed.
+    raw_bytes = canonical_bytes(body, ensure_ascii=False)
 
     if len(raw_bytes) > MAX_BODY_BYTES:
         raise ValueError(f"receipt body too large ({len(raw_bytes)} bytes > {MAX_BODY_BYTES})")
+    return raw_bytes, _sign_headers(raw_bytes, agent)
+
+def _is_timeout(e: BaseException) -> bool:
+    # With the adapter retrying, an exhausted run of read timeouts surfaces as
+    # ConnectionError(MaxRetryError(reason=ReadTimeoutError)), not requests.Timeout.
+    if isinstance(e, requests.Timeout):
+        return True
+    inner = e.args[0] if getattr(e, "args", None) else None
+    return isinstance(getattr(inner, "reason", None), ReadTimeoutError)
 
-    sig = _hmac_hex(EDGE_SECRET, raw_bytes)
+def _post_receipt(
+    cmd_id: str,
+    raw_bytes: bytes,
+    headers: Dict[str, str],
+) -> Dict[str, Any]:
     url = f"{CLOUD_BASE_URL}{RECEIPTS_PATH}"
-    headers = {
-        "Content-Type": "application/json",
-        "X-Nova-Signature": sig,
-        # Optional: stamp for server logs (no secrets)
-        "X-Nova-Agent": agent,
-    }
 
-    # Transient retry loop
-    attempts = max(1, int(RETRIES))
-    backoff  = max(0.0, float(BACKOFF_S))
-    last_err: Optional[str] = None
+    # Single call; transient retries happen inside the session adapter
+    try:
+        r = _SESSION.post(url, data=raw_bytes, headers=headers, timeout=(CONNECT_S, TIMEOUT_S))
+    except requests.RequestException as e:  # timeouts, connection errors, other transport failures
+        if _is_timeout(e):
+            _LOG.warning("ack timeout cmd_id=%s after %d attempt(s)", cmd_id, max(1, RETRIES))
+            return {"ok": False, "status": 599, "body": {"error": "timeout"}}
+        _LOG.warning("ack error cmd_id=%s after %d attempt(s) err=%s: %s",
+                     cmd_id, max(1, RETRIES), type(e).__name__, e)
+        return {"ok": False, "status": 598, "body": {"error": str(e)}}
 
-    for i in range(1, attempts + 1):
+    ct = (r.headers.get("content-type") or "")
+    body_resp: Any = None
+    if "json" in ct:
         try:
-            r = requests.post(url, data=raw_bytes, headers=headers, timeout=TIMEOUT_S)
-            ct = (r.headers.get("content-type") or "")
-            body_resp: Any
-            try:
-                body_resp = r.json() if "json" in ct else r.text
-            except Exception:
-                body_resp = r.text
-
-            if 200 <= r.status_code < 300:
-                _log(f"ack ok cmd_id={cmd_id} http={r.status_code}")
-                return {"ok": True, "status": r.status_code, "body": body_resp}
-
-            # Non-2xx
-            _log(f"ack http={r.status_code} cmd_id={cmd_id} body={str(body_resp)[:300]}")
-            # Retry only on 5xx
-            if 500 <= r.status_code < 600 and i < attempts:
-                time.sleep(backoff * (2 ** (i - 1)))
-                continue
-            return {"ok": False, "status": r.status_code, "body": body_resp}
-
-        except requests.Timeout:
-            last_err = "timeout"
-            _log(f"ack timeout cmd_id={cmd_id} attempt={i}/{attempts}")
-            if i < attempts:
-                time.sleep(backoff * (2 ** (i - 1)))
-                continue
-            return {"ok": False, "status": 599, "body": {"error": "timeout"}}
+            body_resp = _loads(r.content)  # bytes straight in; no text decode first
+        except Exception:
+            pass
+    if body_resp is None:
+        body_resp = r.content.decode("utf-8", "replace")
 
-        except Exception as e:
-            last_err = f"{type(e).__name__}: {e}"
-            _log(f"ack error cmd_id={cmd_id} attempt={i}/{attempts} err={last_err}")
-            if i < attempts:
-                time.sleep(backoff * (2 ** (i - 1)))
-                continue
-            return {"ok": False, "status": 598, "body": {"error": str(e)}}
+    if 200 <= r.status_code < 300:
+        _LOG.info("ack ok cmd_id=%s http=%d", cmd_id, r.status_code)
+        return {"ok": True, "status": r.status_code, "body": body_resp}
 
-    # Should not reach
-    return {"ok": False, "status": 598, "body": {"error": last_err or "unknown"}}
+    # Non-2xx (5xx only after the adapter's retries are exhausted)
+    _LOG.warning("ack http=%d cmd_id=%s body=%.300s", r.status_code, cmd_id, body_resp)
+    return {"ok": False, "status": r.status_code, "body": body_resp}
+
+def send_receipt(
+    *,
+    cmd_id: str,
+    normalized: Dict[str, Any],
+    raw: Optional[Dict[str, Any]] = None,
+    agent_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Send a single receipt to the Bus. Returns dict with {ok: bool, status: int, body: Any}.
+    Will retry on 5xx/timeout up to RETRIES.
+    """
+    _validate_env()
+    raw_bytes, headers = _prepare_receipt(cmd_id, normalized, raw, agent_id)
+    return _post_receipt(cmd_id, raw_bytes, headers)
 
 # ---------- Optional CLI (for quick manual tests) ----------
 if __name__ == "__main__":
     # Example: python receipt_bus.py
     # (Builds a minimal BUY-ok receipt to test the pipe.)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)sZ %(name)s %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    logging.Formatter.converter = time.gmtime
     try:
         _validate_env()
     except Exception as e:
-        _log(f"env error: {e}")
+        _LOG.error("env error: %s", e)
         raise
 
     example = {
@@ -231,11 +329,11 @@ if __name__ == "__main__":
         "quote_filled": 10.01,
         "fee": 0.01,
         "fee_asset": "USDT",
-        "tx_ts": int(time.time() * 1000),
+        "tx_ts": time.time_ns() // 1_000_000,
     }
     res = send_receipt(
         cmd_id="demo-cmd-123",
         normalized=example,
         raw={"note": "demo test only"},
     )
-    _log(f"test result: {res}")
+    _LOG.info("test result: %s", res)
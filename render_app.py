@@ -1,17 +1,33 @@
 from flask import Flask, send_file
-import os
+import os, time, hashlib, threading
 from phase17_dashboard import build, _from_sheet
 app = Flask(__name__)
 
-@app.route("/")
-def home():
+# Rebuild dashboard.html at most once per DASH_TTL_S; visitors in between (and
+# concurrent ones waiting on the lock) share the last build.
+DASH_TTL_S = int(os.getenv("DASH_TTL_S", "30"))
+_LOCK = threading.Lock()
+_LAST = {"ts": 0.0, "etag": None}
+
+def _refresh():
     try:
         df = _from_sheet()
     except Exception:
         import pandas as pd
         df = pd.DataFrame()
     build(df, "dashboard.html")
-    return send_file("dashboard.html")
+    with open("dashboard.html", "rb") as f:
+        _LAST["etag"] = hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+    _LAST["ts"] = time.monotonic()
+
+@app.route("/")
+def home():
+    with _LOCK:
+        if _LAST["etag"] is None or time.monotonic() - _LAST["ts"] >= DASH_TTL_S:
+            _refresh()
+        etag = _LAST["etag"]
+    # conditional: If-None-Match on the same build answers 304
+    return send_file("dashboard.html", conditional=True, etag=etag, max_age=DASH_TTL_S)
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT","5000"))
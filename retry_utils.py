@@ -1,7 +1,9 @@
-import time
+import time, logging
 from functools import wraps
 from gspread.exceptions import APIError
 
+log = logging.getLogger("retry_utils")
+
 def retry_gspread(max_retries=3, delay=2):
     def decorator(func):
         @wraps(func)
@@ -12,7 +14,7 @@ def retry_gspread(max_retries=3, delay=2):
                     return func(*args, **kwargs)
                 except APIError as e:
                     last_exception = e
-                    print(f"⚠️ GSpread retry {attempt+1}/{max_retries} failed: {e}")
+                    log.warning("GSpread retry %d/%d failed: %s", attempt + 1, max_retries, e)
                     time.sleep(delay)
             raise last_exception
         return wrapper
@@ -22,12 +22,19 @@ def _env(key: str, default: str = "") -> str:
     return (os.getenv(key) or default).strip()
 
 
-@dataclass
+@dataclass(frozen=True)
 class LiveGate:
     allowed: bool
     reason: str
 
 
+# Fixed outcomes are shared (LiveGate is frozen); only the mode-dependent
+# reasons are formatted per call.
+_HOLD = LiveGate(False, "edge_hold=true")
+_NOT_ARMED = LiveGate(False, "live_not_armed")
+_ALLOWED = LiveGate(True, "live_allowed")
+
+
 def live_gate(intent_mode: Optional[str] = None) -> LiveGate:
     """Return whether live execution is allowed.
 
@@ -40,17 +47,19 @@ def live_gate(intent_mode: Optional[str] = None) -> LiveGate:
     NOTE: This gate is intentionally minimal and deterministic.
     """
 
+    # Read per call: EDGE_HOLD / LIVE_ARMED are kill switches and must take
+    # effect on the next order, not on the next restart.
     edge_mode = _env("EDGE_MODE", "dry").lower()
     hold = _env("EDGE_HOLD", "false").lower() in {"1", "true", "yes"}
+    armed = _env("LIVE_ARMED", "").upper() == "YES"
     effective = (intent_mode or edge_mode or "").lower()
-    live_armed = _env("LIVE_ARMED", "").upper()
 
     if hold:
-        return LiveGate(False, "edge_hold=true")
+        return _HOLD
     if edge_mode != "live":
         return LiveGate(False, f"edge_mode={edge_mode}")
     if effective != "live":
         return LiveGate(False, f"intent_mode={effective or 'unset'}")
-    if live_armed != "YES":
-        return LiveGate(False, "live_not_armed")
-    return LiveGate(True, "live_allowed")
+    if not armed:
+        return _NOT_ARMED
+    return _ALLOWED
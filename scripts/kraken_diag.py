@@ -3,20 +3,27 @@ BASE = os.getenv("KRAKEN_BASE_URL","https://api.kraken.com").rstrip("/")
 KEY  = os.getenv("KRAKEN_KEY","").strip()
 SEC  = os.getenv("KRAKEN_SECRET","").strip()  # base64
 
+_SESSION = requests.Session()  # keep-alive across k_private calls
+
+# secret is fixed per process: decode and key the SHA-512 HMAC once
+_HMAC_PROTO = hmac.new(base64.b64decode(SEC), None, hashlib.sha512) if SEC else None
+
 def _sign(path, data):
-    if not KEY or not SEC:
+    """Signs in place: `data` gains the nonce (k_private passes its own dict)."""
+    if not KEY or _HMAC_PROTO is None:
         raise SystemExit("Set KRAKEN_KEY and KRAKEN_SECRET in environment.")
-    nonce = str(int(time.time()*1000))
-    data = {**(data or {}), "nonce": nonce}
+    nonce = str(time.time_ns() // 1_000_000)
+    data["nonce"] = nonce
     postdata = urllib.parse.urlencode(data)
-    sha256 = hashlib.sha256((nonce + postdata).encode()).digest()
-    mac = hmac.new(base64.b64decode(SEC), (path.encode() + sha256), hashlib.sha512)
+    mac = _HMAC_PROTO.copy()
+    mac.update(path.encode())
+    mac.update(hashlib.sha256((nonce + postdata).encode()).digest())
     sig = base64.b64encode(mac.digest()).decode()
     return {"hdr": {"API-Key": KEY, "API-Sign": sig}, "qs": postdata}
 
 def k_private(path, data=None):
-    s = _sign(path, data or {})
-    r = requests.post(f"{BASE}{path}", data=s["qs"], headers=s["hdr"], timeout=15)
+    s = _sign(path, dict(data or {}))
+    r = _SESSION.post(f"{BASE}{path}", data=s["qs"], headers=s["hdr"], timeout=15)
     j = r.json()
     if j.get("error"): raise SystemExit(f"Kraken error: {j['error']}")
     print("OK:", list(j["result"].keys())[:5])
@@ -1,6 +1,16 @@
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import os
+from retry_utils import retry_gspread
+
+def _cell(row, col, name):
+    i = col.get(name)
+    return row[i] if i is not None and i < len(row) else ""
+
+@retry_gspread()
+def _flush(ws, changes):
+    # all Target % edits in one request; same input mode update_acell used
+    ws.batch_update(changes, value_input_option="USER_ENTERED")
 
 def run_target_percent_updater():
     print("📊 Updating Target % from Suggested % in Portfolio_Targets...")
@@ -12,25 +22,28 @@ def run_target_percent_updater():
         sheet = client.open_by_url(os.getenv("SHEET_URL"))
         ws = sheet.worksheet("Portfolio_Targets")
 
-        rows = ws.get_all_records()
-        updates = 0
+        # one raw read; only three columns are looked up, by header index
+        values = ws.get_all_values()
+        col = {c.strip(): i for i, c in enumerate(values[0])} if values else {}
+        changes = []
 
-        for i, row in enumerate(rows, start=2):
+        for i, row in enumerate(values[1:], start=2):
             try:
                 target_cell = f"C{i}"  # Target %
                 suggested_cell = f"G{i}"  # Suggested Target %
 
-                target = float(str(row.get("Target %", 0)).strip() or 0)
-                suggested = float(str(row.get("Suggested Target %", 0)).strip() or 0)
+                target = float(_cell(row, col, "Target %").strip() or 0)
+                suggested = float(_cell(row, col, "Suggested Target %").strip() or 0)
 
                 if suggested > 0 and abs(suggested - target) >= 0.01:
-                    ws.update_acell(target_cell, suggested)
-                    updates += 1
-                    print(f"✅ Updated {row.get('Token', '')}: {target}% → {suggested}%")
+                    changes.append({"range": target_cell, "values": [[suggested]]})
+                    print(f"✅ Updated {_cell(row, col, 'Token')}: {target}% → {suggested}%")
             except Exception as err:
                 print(f"⚠️ Could not update row {i}: {err}")
 
-        print(f"✅ Target % update complete. {updates} tokens adjusted.")
+        if changes:
+            _flush(ws, changes)
+        print(f"✅ Target % update complete. {len(changes)} tokens adjusted.")
 
     except Exception as e:
         print(f"❌ Error updating Target %: {e}")
@@ -1,8 +1,9 @@
 # telemetry.py — Edge Balance Reporter
 # Pushes balances to Bus using Canonical HMAC.
 
-import os, time, json, requests
+import os, time, json, logging, requests
 from typing import Dict
+from requests.adapters import HTTPAdapter
 import hmac_utils  # Uses our new shared signer
 
 # Config
@@ -12,6 +13,27 @@ SECRET   = os.getenv("TELEMETRY_SECRET") or os.getenv("OUTBOX_SECRET") or ""
 AGENT_ID = os.getenv("AGENT_ID", "edge-primary")
 POLL_SEC = int(os.getenv("EDGE_POLL_SECS", "60"))
 
+# Keep-alive pool: every POLL_SEC push reuses one TLS connection to the Bus
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+_LOG = logging.getLogger("telemetry")  # lazy %-args; handlers come from the host
+
+_TIMEOUT = (3, 10)  # (connect, read)
+_HTTP2 = False
+
+# Opt-in HTTP/2 (TELEMETRY_HTTP2=1 + httpx[http2] installed): pushes share one
+# multiplexed TLS connection to the Bus. Falls back to the requests pool above.
+if os.getenv("TELEMETRY_HTTP2", "0") == "1":
+    try:
+        import httpx
+        _SESSION = httpx.Client(http2=True, headers={"Content-Type": "application/json"},
+                                limits=httpx.Limits(max_keepalive_connections=4))
+        _TIMEOUT = httpx.Timeout(_TIMEOUT[1], connect=_TIMEOUT[0])
+        _HTTP2 = True
+    except Exception as e:
+        _LOG.warning("TELEMETRY_HTTP2=1 but httpx[http2] unavailable (%s); using requests", e)
+
 def get_mock_balances() -> Dict[str, Dict[str, float]]:
     """
     Replace this with your actual CCXT/Exchange polling logic.
@@ -26,31 +48,37 @@ def push_telemetry():
     
     payload = {
         "agent_id": AGENT_ID,
-        "ts": int(time.time()),
+        "ts": time.time_ns() // 1_000_000_000,
         "balances": balances
     }
     
-    # SIGNING FIX: Use canonical signer
-    headers = hmac_utils.get_auth_headers(payload, SECRET)
-    
     try:
-        # Send RAW canonical bytes to ensure no re-serialization drift
-        # requests.post(json=...) might re-serialize with spaces
-        body_bytes = hmac_utils.canonical_bytes(payload)
+        # SIGNING FIX: Use canonical signer. Serialized once; the signed bytes
+        # are sent as-is, since requests.post(json=...) might re-serialize with spaces
+        body_bytes, headers = hmac_utils.signed_request(payload, SECRET)
         
-        r = requests.post(PUSH_URL, data=body_bytes, headers=headers, timeout=10)
-        if r.ok:
-            print(f"[Telemetry] Push OK: {r.status_code}")
+        if _HTTP2:
+            r = _SESSION.post(PUSH_URL, content=body_bytes, headers=headers, timeout=_TIMEOUT)
+        else:
+            r = _SESSION.post(PUSH_URL, data=body_bytes, headers=headers, timeout=_TIMEOUT)
+        if 200 <= r.status_code < 300:
+            _LOG.info("push ok: %d", r.status_code)
         else:
-            print(f"[Telemetry] Push Fail: {r.status_code} {r.text}")
+            _LOG.warning("push fail: %d %s", r.status_code, r.text)
     except Exception as e:
-        print(f"[Telemetry] Error: {e}")
+        _LOG.warning("push error: %s", e)
 
 def run_loop():
-    print(f"Starting Telemetry Loop | Agent: {AGENT_ID} | Bus: {BUS_BASE}")
+    _LOG.info("starting telemetry loop | agent=%s bus=%s", AGENT_ID, BUS_BASE)
     while True:
         push_telemetry()
         time.sleep(POLL_SEC)
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)sZ %(name)s %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    logging.Formatter.converter = time.gmtime
     run_loop()
@@ -1,5 +1,6 @@
 # telemetry_db.py — Edge-side SQLite mirror for balances, receipts, heartbeats
-import os, json, sqlite3, time
+import os, json, sqlite3, time, threading, weakref
+from contextlib import contextmanager
 from typing import Dict, Any, Iterable, Optional
 
 DB_PATH = os.getenv("EDGE_TELEMETRY_DB", "nova_telemetry.db")
@@ -9,6 +10,9 @@ PRAGMAS = [
     "PRAGMA synchronous=NORMAL;",
     "PRAGMA temp_store=MEMORY;",
     "PRAGMA foreign_keys=ON;",
+    "PRAGMA busy_timeout=10000;",
+    "PRAGMA mmap_size=67108864;",   # 64 MiB memory-mapped reads
+    "PRAGMA cache_size=-20000;",    # ~20 MB page cache per connection
 ]
 
 SCHEMA = """
@@ -47,6 +51,21 @@ CREATE TABLE IF NOT EXISTS heartbeats (
 CREATE INDEX IF NOT EXISTS idx_hb_ts ON heartbeats(ts);
 """
 
+# Split once at import instead of on every connection open
+_SCHEMA_STMTS = [s.strip() + ";" for s in SCHEMA.split(";") if s.strip()]
+
+_SQL_INS_RECEIPT = (
+    "INSERT INTO receipts(cmd_id,venue,symbol,requested_symbol,resolved_symbol,side,status,order_id,result_json,created_at) "
+    "VALUES(?,?,?,?,?,?,?,?,?,?)"
+)
+_SQL_INS_BAL = "INSERT OR REPLACE INTO balances(venue,asset,free,ts) VALUES(?,?,?,?)"
+_SQL_INS_HB = "INSERT INTO heartbeats(agent,ok,latency_ms,ts) VALUES(?,?,?,?)"
+_SQL_LAST_BALANCES = (
+    "SELECT b.venue, b.asset, b.free FROM balances b "
+    "JOIN (SELECT venue, MAX(ts) mx FROM balances GROUP BY venue) m "
+    "ON b.venue = m.venue AND b.ts = m.mx"
+)
+
 # Add near top
 HEADLINE = {"USDT","USDC","USD","BTC","XBT","ETH"}
 
@@ -62,23 +81,69 @@ def _clean_balances(bal_map):
             out[k_up] = val
     return out
 
+# One connection per thread, opened on first use and kept: callers no longer
+# pay for a fresh sqlite handle + PRAGMAs on every log call, and threads never
+# share a connection (or its transaction state). WAL lets them write side by side.
+# Nothing else holds the connection strongly: when a thread ends, its local
+# slot is dropped and the finalizer closes that thread's handle (and any still
+# open at interpreter exit, since finalize runs atexit).
+_tls = threading.local()
+
+class _ConnSlot:
+    __slots__ = ("con", "__weakref__")
+
+    def __init__(self, con):
+        self.con = con
+
+def _close_quietly(con):
+    try:
+        con.close()
+    except Exception:
+        pass
+
+def _ensure_schema(con):
+    # IF NOT EXISTS throughout, so it is safe when threads race on a new file
+    for stmt in _SCHEMA_STMTS: con.execute(stmt)
+
 def _conn():
-    first = not os.path.exists(DB_PATH)
-    con = sqlite3.connect(DB_PATH, isolation_level=None, timeout=10)
-    con.row_factory = sqlite3.Row
-    for p in PRAGMAS: con.execute(p)
-    if first:
-        for stmt in filter(None, SCHEMA.split(";")):
-            s = stmt.strip()
-            if s: con.execute(s + ";")
-    return con
+    slot = getattr(_tls, "slot", None)
+    if slot is None:
+        con = sqlite3.connect(DB_PATH, isolation_level=None, timeout=10,
+                              check_same_thread=False, cached_statements=128)
+        con.row_factory = sqlite3.Row
+        for p in PRAGMAS: con.execute(p)
+        _ensure_schema(con)
+        slot = _tls.slot = _ConnSlot(con)
+        weakref.finalize(slot, _close_quietly, con)
+    return slot.con
+
+@contextmanager
+def transaction():
+    """
+    Group several writes on this thread's connection into one write transaction:
+        with telemetry_db.transaction():
+            upsert_balances(...); log_heartbeat(...)
+    BEGIN IMMEDIATE takes the write lock up front (no mid-transaction
+    SQLITE_BUSY upgrade); COMMIT on exit, ROLLBACK on error. Nested use joins
+    the outer transaction.
+    """
+    con = _conn()
+    if con.in_transaction:
+        yield con
+        return
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        yield con
+    except BaseException:
+        con.execute("ROLLBACK")
+        raise
+    con.execute("COMMIT")
 
 def log_receipt(*, cmd_id: str, receipt: Dict[str, Any]):
     con = _conn()
     now = int(time.time())
     con.execute(
-        "INSERT INTO receipts(cmd_id,venue,symbol,requested_symbol,resolved_symbol,side,status,order_id,result_json,created_at) "
-        "VALUES(?,?,?,?,?,?,?,?,?,?)",
+        _SQL_INS_RECEIPT,
         (
             str(cmd_id),
             receipt.get("venue"),
@@ -97,18 +162,19 @@ def upsert_balances(venue: str, bal_map: Dict[str, float], ts: Optional[int] = N
     con = _conn()
     t = int(ts or time.time())
     bal_map = _clean_balances(bal_map)
-    for asset, free in (bal_map or {}).items():
-        if asset is None: continue
-        con.execute(
-            "INSERT OR REPLACE INTO balances(venue,asset,free,ts) VALUES(?,?,?,?)",
-            (venue, str(asset).upper(), float(free or 0.0), t),
-        )
+    rows = [(venue, str(asset).upper(), float(free or 0.0), t)
+            for asset, free in (bal_map or {}).items() if asset is not None]
+    if not rows:
+        return
+    # one bound batch in one transaction instead of an autocommit per asset
+    with transaction():
+        con.executemany(_SQL_INS_BAL, rows)
 
 def log_heartbeat(agent: str, ok: bool, latency_ms: int = 0, ts: Optional[int] = None):
     con = _conn()
     t = int(ts or time.time())
     con.execute(
-        "INSERT INTO heartbeats(agent,ok,latency_ms,ts) VALUES(?,?,?,?)",
+        _SQL_INS_HB,
         (agent, 1 if ok else 0, int(latency_ms or 0), t),
     )
 
@@ -116,17 +182,13 @@ def aggregates(last_seconds: int = 24 * 3600) -> Dict[str, Any]:
     con = _conn()
     cutoff = int(time.time()) - int(last_seconds)
     # trades count by venue
-    trades = {}
-    for r in con.execute("SELECT venue, COUNT(*) c FROM receipts WHERE created_at >= ? GROUP BY venue", (cutoff,)):
-        trades[r["venue"]] = int(r["c"])
-    # last balances snapshot per venue
-    bals = {}
-    # get max ts per venue
-    last_ts = {r["venue"]: r["mx"] for r in con.execute("SELECT venue, MAX(ts) mx FROM balances GROUP BY venue")}
-    for v, ts in last_ts.items():
-        bals[v] = {r["asset"]: r["free"] for r in con.execute(
-            "SELECT asset, free FROM balances WHERE venue=? AND ts=?", (v, ts)
-        )}
+    trades = {r["venue"]: int(r["c"]) for r in con.execute(
+        "SELECT venue, COUNT(*) c FROM receipts WHERE created_at >= ? GROUP BY venue", (cutoff,)
+    )}
+    # last balances snapshot per venue: one query, SQLite picks each venue's max ts
+    bals: Dict[str, Dict[str, float]] = {}
+    for r in con.execute(_SQL_LAST_BALANCES):
+        bals.setdefault(r["venue"], {})[r["asset"]] = r["free"]
     # last heartbeat
     hb = con.execute("SELECT agent, ok, latency_ms, ts FROM heartbeats ORDER BY ts DESC LIMIT 1").fetchone()
     hb_row = dict(hb) if hb else None
@@ -7,6 +7,7 @@
 # - Deterministic JSON signing bytes (sorted keys + compact separators)
 # - Secret tolerance: TELEMETRY_SECRET -> EDGE_SECRET -> OUTBOX_SECRET
 # - Compatibility headers: X-OUTBOX-SIGN, X-TELEMETRY-SIGN, X-Nova-Signature, X-NOVA-SIGNATURE, X-NOVA-SIGN, X-NT-Sig
+#   (or only TELEMETRY_SIGN_HEADER when set)
 # - Required venues always present with truthful zero placeholders for quotes
 # - Cache mkdir safe even if path has no directory
 # - Does not crash Edge on network failures (best-effort push)
@@ -14,21 +15,30 @@
 import os
 import json
 import time
+import logging
 import hmac
 import hashlib
+import random
 import threading
+import atexit
+from functools import lru_cache
 from typing import Dict, Any, Tuple, Optional, List
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from hmac_utils import canonical_bytes
 
 
 # --------------------------------------------------------------------------- #
 # Helpers
 # --------------------------------------------------------------------------- #
+@lru_cache(maxsize=1)
 def _resolve_agent_id() -> str:
     """
     Canonical agent id to use for telemetry.
     Priority: EDGE_AGENT_ID -> AGENT_ID -> AGENT -> "edge"
+    Resolved once per process; _resolve_agent_id.cache_clear() after changing env.
     """
     return (os.getenv("EDGE_AGENT_ID") or os.getenv("AGENT_ID") or os.getenv("AGENT") or "edge").strip() or "edge"
 
@@ -43,12 +53,24 @@ def _canonical_json_bytes(obj: dict) -> bytes:
       - sort_keys=True
       - compact separators
       - UTF-8 encoding
+    hmac_utils.canonical_bytes is the one shared json.dumps form, straight to bytes.
     """
-    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return canonical_bytes(obj, ensure_ascii=False)
+
+
+# secret str -> keyed HMAC prototype. The key schedule (encode + ipad/opad) runs
+# once per secret; each push is copy() + update(). Keyed by the secret itself, so
+# a rotated secret simply gets its own entry.
+_HMAC_PROTOS: Dict[str, Any] = {}
 
 
 def _hmac_sha256_hex(secret: str, body_bytes: bytes) -> str:
-    return hmac.new(secret.encode("utf-8"), body_bytes, hashlib.sha256).hexdigest()
+    proto = _HMAC_PROTOS.get(secret)
+    if proto is None:
+        proto = _HMAC_PROTOS[secret] = hmac.new(secret.encode("utf-8"), None, hashlib.sha256)
+    m = proto.copy()
+    m.update(body_bytes)
+    return m.hexdigest()
 
 
 def _resolve_signing_secret() -> str:
@@ -59,20 +81,26 @@ def _resolve_signing_secret() -> str:
     return (os.getenv("TELEMETRY_SECRET") or os.getenv("EDGE_SECRET") or os.getenv("OUTBOX_SECRET") or "").strip()
 
 
+# Compatibility: Bus has historically used different header names. The same
+# signature goes out under each, with X-OUTBOX-SIGN as primary. Once the Bus
+# version is known, TELEMETRY_SIGN_HEADER=<name> sends just that one.
+_SIG_HEADER_KEYS = (
+    "X-OUTBOX-SIGN",        # Phase 24/25 canonical
+    "X-TELEMETRY-SIGN",     # legacy/older variants
+    "X-Nova-Signature",
+    "X-NOVA-SIGNATURE",
+    "X-NOVA-SIGN",
+    "X-NT-Sig",
+)
+_SIGN_HEADER = (os.getenv("TELEMETRY_SIGN_HEADER") or "").strip()
+if _SIGN_HEADER:
+    _SIG_HEADER_KEYS = (_SIGN_HEADER,)
+
+
 def _auth_headers_for_sig(sig: str) -> dict:
-    """
-    Compatibility: Bus has historically used different header names.
-    We send the same signature under multiple headers, with X-OUTBOX-SIGN as primary.
-    """
-    return {
-        "Content-Type": "application/json",
-        "X-OUTBOX-SIGN": sig,        # Phase 24/25 canonical
-        "X-TELEMETRY-SIGN": sig,     # legacy/older variants
-        "X-Nova-Signature": sig,
-        "X-NOVA-SIGNATURE": sig,
-        "X-NOVA-SIGN": sig,
-        "X-NT-Sig": sig,
-    }
+    h = {"Content-Type": "application/json"}
+    h.update(dict.fromkeys(_SIG_HEADER_KEYS, sig))
+    return h
 
 
 # --------------------------------------------------------------------------- #
@@ -96,24 +124,38 @@ CACHE_PATH = os.getenv("EDGE_LAST_BALANCES_PATH", os.path.expanduser("~/.nova/la
 
 # Quotes we treat as “venue liquidity”
 QUOTES = ("USD", "USDC", "USDT")
+_QUOTES_SET = frozenset(QUOTES)  # membership tests in the per-asset loop
+
+# Bus route for balance snapshots
+PUSH_BALANCES_PATH = "/api/telemetry/push_balances"
 
 # Network / request timeouts
 REQ_TIMEOUT = float(os.getenv("TELEMETRY_REQ_TIMEOUT", "10"))
 
+# Keep-alive pool: every periodic push (and retry) reuses one TLS connection to
+# the Bus instead of a fresh handshake per requests.post. The retry loop in
+# push_balances_once owns retries, so the adapter doesn't.
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0))
+_HTTP.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0))
+atexit.register(_HTTP.close)  # release pooled sockets cleanly on shutdown
+
 # Optional allow-lists (do not enforce by default)
 PUSH_VENUES = os.getenv("PUSH_VENUES", "").strip()
 PUSH_ASSETS = os.getenv("PUSH_ASSETS", "").strip()
 
 
-def _log(msg: str) -> None:
-    if TELEM_DEBUG:
-        print(f"[telemetry_sender] {msg}")
+# Lazy %-style logging. Summaries are INFO (TELEMETRY_SUMMARY_ENABLED), payload
+# dumps DEBUG (TELEMETRY_DEBUG_DUMP), failures WARNING; the flags set the level,
+# so disabled lines are never formatted. Handlers come from the host process.
+log = logging.getLogger("telemetry_sender")
+log.setLevel(logging.DEBUG if TELEM_DEBUG_DUMP else logging.INFO if TELEM_DEBUG else logging.WARNING)
 
 
 def _dump(obj: Any) -> None:
-    if TELEM_DEBUG_DUMP:
+    if log.isEnabledFor(logging.DEBUG):
         try:
-            print("[telemetry_sender] dump:", json.dumps(obj, indent=2, sort_keys=True)[:4000])
+            log.debug("dump: %.4000s", json.dumps(obj, indent=2, sort_keys=True))
         except Exception:
             pass
 
@@ -126,10 +168,8 @@ def _stamp_agent(payload: dict) -> dict:
     Force canonical agent identity onto any payload (including cache restores).
     """
     try:
-        agent = _resolve_agent_id()
         payload = payload or {}
-        payload["agent"] = agent
-        payload["agent_id"] = agent
+        payload["agent"] = payload["agent_id"] = _resolve_agent_id()
     except Exception:
         pass
     return payload
@@ -147,13 +187,33 @@ def _load_cache() -> Optional[dict]:
         return None
 
 
-def _save_cache(obj: dict) -> None:
+_LAST_CACHE_SHA: Optional[str] = None
+
+
+def _save_cache(obj: dict, raw: Optional[bytes] = None) -> None:
+    """
+    Persist the last pushed payload. `raw` is its canonical body when the caller
+    already has it. Skips the write when only "ts" changed since the last save
+    (balances are usually static between pushes) and never leaves a torn file:
+    write to .tmp, then os.replace.
+    """
+    global _LAST_CACHE_SHA
     try:
+        if raw is None:
+            raw = _canonical_json_bytes(obj)
+        # keys are sorted and "ts" is the last top-level one: fingerprint what precedes it
+        head, sep, _ = raw.rpartition(b',"ts":')
+        h = hashlib.sha256(head if sep else raw).hexdigest()
+        if h == _LAST_CACHE_SHA:
+            return
         d = os.path.dirname(CACHE_PATH)
         if d:
             os.makedirs(d, exist_ok=True)
-        with open(CACHE_PATH, "w", encoding="utf-8") as f:
-            json.dump(obj, f, separators=(",", ":"))
+        tmp = CACHE_PATH + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, CACHE_PATH)
+        _LAST_CACHE_SHA = h
     except Exception:
         # Cache is best-effort only
         pass
@@ -197,13 +257,29 @@ def _required_venues(by_venue_raw: Dict[str, Any]) -> List[str]:
     return ["BINANCEUS", "KRAKEN", "COINBASE"]
 
 
+@lru_cache(maxsize=1)
+def _required_venues_cached() -> Tuple[str, ...]:
+    """
+    _required_venues() only reads env, which is fixed for the process: resolve
+    and normalize it once. _required_venues_cached.cache_clear() after env changes.
+    """
+    return tuple(v for v in ((x or "").upper().strip() for x in _required_venues({})) if v)
+
+
+@lru_cache(maxsize=1)
+def _allowlists() -> Tuple[frozenset, frozenset]:
+    return (
+        frozenset(_env_list("PUSH_VENUES")) if PUSH_VENUES else frozenset(),
+        frozenset(_env_list("PUSH_ASSETS")) if PUSH_ASSETS else frozenset(),
+    )
+
+
 def _filter_allowlists(by_venue: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
     """
     Optional allowlists: PUSH_VENUES / PUSH_ASSETS.
     If not set, returns original.
     """
-    venues_allow = set(_env_list("PUSH_VENUES")) if PUSH_VENUES else set()
-    assets_allow = set(_env_list("PUSH_ASSETS")) if PUSH_ASSETS else set()
+    venues_allow, assets_allow = _allowlists()
 
     if not venues_allow and not assets_allow:
         return by_venue
@@ -232,6 +308,43 @@ def _filter_allowlists(by_venue: Dict[str, Dict[str, float]]) -> Dict[str, Dict[
 # --------------------------------------------------------------------------- #
 # HMAC + HTTP
 # --------------------------------------------------------------------------- #
+def _build_signed_request(payload: dict) -> Tuple[Optional[bytes], Any]:
+    """
+    Serialize + sign once -> (body, headers). On a config problem returns
+    (None, reason) instead, so callers can surface it without raising.
+    """
+    # resolved per call: a secret loaded (.env order) or rotated after import still applies
+    secret = _resolve_signing_secret()
+    if not secret:
+        return None, "No signing secret set (TELEMETRY_SECRET/EDGE_SECRET/OUTBOX_SECRET)"
+    body = _canonical_json_bytes(payload)
+    return body, _auth_headers_for_sig(_hmac_sha256_hex(secret, body))
+
+
+def _retry_after_s(resp) -> Optional[float]:
+    # delta-seconds form only; an HTTP-date falls back to jittered backoff
+    try:
+        v = float(resp.headers.get("Retry-After"))
+    except (TypeError, ValueError, AttributeError):
+        return None
+    return v if v >= 0 else None
+
+
+def _post_raw(path: str, body: bytes, headers: dict) -> Tuple[int, str, Optional[float]]:
+    """POST already-signed bytes to the Bus -> (status, text, Retry-After s). Never raises."""
+    # per call for the same reason as the secret; three env reads are noise next to a POST
+    base = (os.getenv("CLOUD_BASE_URL") or os.getenv("BUS_BASE_URL") or os.getenv("BASE_URL") or "").rstrip("/")
+    if not base:
+        return 0, "BUS_BASE not configured (CLOUD_BASE_URL/BUS_BASE_URL/BASE_URL)", None
+
+    url = f"{base}{path}"
+    try:
+        resp = _HTTP.post(url, data=body, headers=headers, timeout=REQ_TIMEOUT)
+        return resp.status_code, resp.text, _retry_after_s(resp)
+    except Exception as e:
+        return 0, f"POST failed: {e}", None
+
+
 def _post_json(path: str, payload: dict) -> Tuple[int, str]:
     """
     POST signed JSON to Bus, using deterministic serialization so HMAC matches.
@@ -242,25 +355,11 @@ def _post_json(path: str, payload: dict) -> Tuple[int, str]:
       - stamps canonical agent id
       - sends signature under multiple header names
     """
-    base = (os.getenv("CLOUD_BASE_URL") or os.getenv("BUS_BASE_URL") or os.getenv("BASE_URL") or "").rstrip("/")
-    if not base:
-        return 0, "BUS_BASE not configured (CLOUD_BASE_URL/BUS_BASE_URL/BASE_URL)"
-
-    secret = _resolve_signing_secret()
-    if not secret:
-        return 0, "No signing secret set (TELEMETRY_SECRET/EDGE_SECRET/OUTBOX_SECRET)"
-
-    payload = _stamp_agent(payload)
-    body = _canonical_json_bytes(payload)
-    sig = _hmac_sha256_hex(secret, body)
-    headers = _auth_headers_for_sig(sig)
-
-    url = f"{base}{path}"
-    try:
-        resp = requests.post(url, data=body, headers=headers, timeout=REQ_TIMEOUT)
-        return resp.status_code, resp.text
-    except Exception as e:
-        return 0, f"POST failed: {e}"
+    body, headers = _build_signed_request(_stamp_agent(payload))
+    if body is None:
+        return 0, headers
+    code, text, _ = _post_raw(path, body, headers)
+    return code, text
 
 
 # --------------------------------------------------------------------------- #
@@ -300,10 +399,10 @@ def _collect_balances() -> dict:
         except Exception as ee:
             errors["COINBASE_FALLBACK"] = str(ee)[:220]
 
-        _log(f"get_balances() error; using COINBASE-only fallback: {e}")
+        log.info("get_balances() error; using COINBASE-only fallback: %s", e)
 
     # Optional debug: show what we actually got back per venue (quotes only)
-    if TELEM_DEBUG or TELEM_DEBUG_DUMP:
+    if log.isEnabledFor(logging.INFO):
         try:
             dbg_bits = []
             for venue, assets in (by_venue_raw or {}).items():
@@ -318,16 +417,18 @@ def _collect_balances() -> dict:
                             pieces.append(f"{q}=?")
                 dbg_bits.append(f"{venue}:{','.join(pieces) or 'no-quotes'}")
             if dbg_bits:
-                print(f"[telemetry] raw balances venues={len(by_venue_raw)} " + " | ".join(dbg_bits))
+                log.info("raw balances venues=%d %s", len(by_venue_raw), " | ".join(dbg_bits))
             else:
-                print("[telemetry] raw balances EMPTY from get_balances()")
+                log.info("raw balances EMPTY from get_balances()")
         except Exception as e:
             errors["DEBUG_SUMMARY"] = str(e)[:220]
-            print(f"[telemetry] debug summary failed: {e}")
+            log.warning("debug summary failed: %s", e)
 
     # Normalize into by_venue (only quote assets) and flat (sum of non-quote assets across venues)
     by_venue: Dict[str, Dict[str, float]] = {}
     flat: Dict[str, float] = {}
+    quotes = _QUOTES_SET
+    flat_get = flat.get
 
     for venue, assets in (by_venue_raw or {}).items():
         if not isinstance(assets, dict):
@@ -349,20 +450,16 @@ def _collect_balances() -> dict:
             if not a:
                 continue
 
-            if a in QUOTES:
+            if a in quotes:
                 v_out[a] = v_out.get(a, 0.0) + x
             else:
-                flat[a] = flat.get(a, 0.0) + x
+                flat[a] = flat_get(a, 0.0) + x
 
         if v_out:
             by_venue[vkey] = v_out
 
     # Ensure required venues are present (zero placeholders are OK / truthful)
-    required = _required_venues(by_venue_raw)
-    for v in required:
-        v = (v or "").upper().strip()
-        if not v:
-            continue
+    for v in _required_venues_cached():
         if v not in by_venue:
             by_venue[v] = {q: 0.0 for q in QUOTES}
         else:
@@ -450,49 +547,88 @@ def push_balances_once(use_cache_if_empty: bool = True) -> bool:
     payload = _stamp_agent(payload)
 
     # Always emit a compact snapshot line so Edge logs show balances evolution.
-    if TELEM_DEBUG or TELEM_DEBUG_DUMP:
+    if log.isEnabledFor(logging.INFO):
         try:
-            summary = _summarize_snapshot(payload)
-            print(f"[telemetry] snapshot {summary}")
-            if TELEM_DEBUG_DUMP:
+            log.info("snapshot %s", _summarize_snapshot(payload))
+            if log.isEnabledFor(logging.DEBUG):
                 try:
-                    dumped = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+                    dumped = _canonical_json_bytes(payload).decode("utf-8")
                     if len(dumped) > 2000:
                         dumped = dumped[:2000] + "...(truncated)"
-                    print(f"[telemetry] payload={dumped}")
+                    log.debug("payload=%s", dumped)
                 except Exception as e:
-                    print(f"[telemetry] payload-dump-error: {e}")
+                    log.warning("payload-dump-error: %s", e)
         except Exception as e:
-            print(f"[telemetry] snapshot-error: {e}")
+            log.warning("snapshot-error: %s", e)
+
+    return _push_single(payload)
 
-    ok = False
-    # bounded retry/backoff
-    for attempt in (1, 2, 3):
+
+RETRY_AFTER_MAX_S = 60.0  # a Bus-sent Retry-After never parks the pusher longer
+
+
+def _send_with_retry(path: str, body: bytes, headers: dict) -> Tuple[bool, int]:
+    """
+    Bounded retry over already-signed bytes -> (ok, last status).
+    Full-jitter backoff (uniform 0..2**attempt s) so a fleet of Edges doesn't
+    re-hit the Bus in lockstep after a blip; 429 honors Retry-After; other 4xx
+    are final (resending the same bytes can't fix them).
+    """
+    code = 0
+    attempts = 3
+    for attempt in range(1, attempts + 1):
+        retry_after = None
         try:
-            code, text = _post_json("/api/telemetry/push_balances", payload)
-            ok = 200 <= int(code or 0) < 300
-            if ok:
-                _save_cache(payload)
-                _log(f"push_balances ok (attempt {attempt})")
+            code, text, retry_after = _post_raw(path, body, headers)
+            code = int(code or 0)
+            if 200 <= code < 300:
+                log.info("push_balances ok (attempt %d)", attempt)
+                return True, code
+            log.warning("push_balances failed %s: %.300s", code, text or "")
+            if 400 <= code < 500 and code != 429:
                 break
-            else:
-                print(f"[telemetry] push_balances failed {code}: {(text or '')[:300]}")
         except Exception as e:
-            # should be rare because _post_json never raises, but keep best-effort behavior
-            print(f"[telemetry] error: {e}")
-        time.sleep(2 ** attempt)  # 2s, 4s, 8s backoff
+            # should be rare because _post_raw never raises, but keep best-effort behavior
+            log.warning("error: %s", e)
+        if attempt == attempts:
+            break
+        if code == 429 and retry_after is not None:
+            time.sleep(min(retry_after, RETRY_AFTER_MAX_S))
+        else:
+            time.sleep(random.uniform(0, 2 ** attempt))
+    return False, code
+
+
+def _push_single(payload: dict) -> bool:
+    # Serialized and signed once; retries resend the same bytes
+    body, headers = _build_signed_request(payload)
+    if body is None:
+        log.warning("push_balances failed 0: %s", headers)
+        return False
+    ok, _ = _send_with_retry(PUSH_BALANCES_PATH, body, headers)
+    if ok:
+        _save_cache(payload, body)
     return ok
 
 
+_pusher: Optional[threading.Thread] = None
+_pusher_lock = threading.Lock()
+_pusher_stop = threading.Event()
+
+
 def start_balance_pusher():
     """
     Start background loop.
     Compatibility: callable with no args.
+    One pusher per process: repeated calls return the already-running thread
+    instead of starting another one. stop_balance_pusher() ends it.
     Honors:
       PUSH_BALANCES_ENABLED (if set; otherwise starts like legacy behavior)
       PUSH_BALANCES_EVERY_S / PUSH_BALANCES_INTERVAL_SECS
       PUSH_BALANCES_ON_BOOT
     """
+    global _pusher
+
     def loop():
         if PUSH_ON_BOOT:
             push_balances_once(use_cache_if_empty=True)
@@ -500,18 +636,32 @@ def start_balance_pusher():
         # If PUSH_BALANCES_ENABLED is explicitly disabled, stay dormant after boot.
         # This avoids surprising behavior, but preserves legacy boot snapshot if desired.
         if os.getenv("PUSH_BALANCES_ENABLED") is not None and not PUSH_ENABLED:
-            _log("PUSH_BALANCES_ENABLED=0; exiting balance pusher loop after boot snapshot")
+            log.info("PUSH_BALANCES_ENABLED=0; exiting balance pusher loop after boot snapshot")
             return
 
-        while True:
-            start = time.time()
+        # Schedule on the monotonic clock so NTP steps / suspend can't double-fire
+        # or stall the loop; wall time is only used for the payload "ts".
+        while not _pusher_stop.is_set():
+            start = time.monotonic()
             push_balances_once(use_cache_if_empty=False)
-            slp = max(5, int(PUSH_IVL) - int(time.time() - start))
-            time.sleep(slp)
+            slp = max(5.0, PUSH_IVL - (time.monotonic() - start))
+            _pusher_stop.wait(slp)  # interruptible sleep
+
+    with _pusher_lock:
+        if _pusher is not None and _pusher.is_alive():
+            return _pusher
+        _pusher_stop.clear()
+        _pusher = threading.Thread(target=loop, name="balance-pusher", daemon=True)
+        _pusher.start()
+        return _pusher
+
 
-    t = threading.Thread(target=loop, name="balance-pusher", daemon=True)
-    t.start()
-    return t
+def stop_balance_pusher(timeout: Optional[float] = None) -> None:
+    """Wake the pusher out of its sleep and let it exit after the current push."""
+    _pusher_stop.set()
+    t = _pusher
+    if t is not None and t is not threading.current_thread():
+        t.join(timeout)
 
 
 # --------------------------------------------------------------------------- #
@@ -524,4 +674,5 @@ def main() -> int:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(format="[%(name)s] %(message)s")
     raise SystemExit(main())
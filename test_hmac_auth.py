@@ -0,0 +1,42 @@
+# test_hmac_auth.py — sign/verify must stay byte-identical to plain hmac.new
+import hmac, hashlib, time
+from hmac_auth import sign, verify
+
+def _ref(secret, body, ts):
+    return hmac.new(secret.encode(), ts.encode() + b"." + body, hashlib.sha256).hexdigest()
+
+def test_sign_matches_reference():
+    for secret in ("s3cret", "ünïcode"):
+        for body in (b"", b'{"a":1}', "café".encode(), bytes(range(256))):
+            ts = "1693612345"
+            assert sign(secret, body, ts) == _ref(secret, body, ts)
+
+def test_cached_templates_do_not_leak_between_secrets():
+    body, ts = b'{"x":1}', "1700000000"
+    a1 = sign("a", body, ts)
+    sign("b", body, ts)
+    assert sign("a", body, ts) == a1 == _ref("a", body, ts)
+    assert sign("k" * 100, body, ts) == _ref("k" * 100, body, ts)  # >64B key gets hashed
+
+def test_verify():
+    secret, body = "s3cret", b'{"cmd":"ack"}'
+    ts = str(int(time.time()))
+    sig = sign(secret, body, ts)
+    assert verify(secret, body, ts, sig)
+    assert not verify(secret, body + b" ", ts, sig)              # tampered body
+    assert not verify("wrong", body, ts, sig)
+    assert not verify(secret, body, ts, sig[:-1])                # wrong length
+    assert not verify(secret, body, ts, sig + "0")
+    assert not verify(secret, body, ts, "")
+    assert not verify(secret, body, ts, sig.upper())             # lowercase hex only
+    assert not verify(secret, body, ts, "zz" + sig[2:])
+    assert not verify("", body, ts, sig)
+    old = str(int(time.time()) - 1000)
+    assert not verify(secret, body, old, sign(secret, body, old))  # stale
+    assert not verify(secret, body, "not-a-ts", sig)
+
+if __name__ == "__main__":
+    test_sign_matches_reference()
+    test_cached_templates_do_not_leak_between_secrets()
+    test_verify()
+    print("ok")
@@ -0,0 +1,66 @@
+# test_hmac_utils.py — canonical_bytes must match json.dumps byte-for-byte
+import json, math, hmac, hashlib
+from urllib.parse import urlencode
+from hmac_utils import canonical_bytes, canonical_sign, signed_request, sign, get_auth_headers
+
+def _stdlib(body, ensure_ascii=True):
+    return json.dumps(body, sort_keys=True, separators=(",", ":"),
+                      ensure_ascii=ensure_ascii).encode("utf-8")
+
+CASES = [
+    {"a": 1, "b": "x", "c": None, "d": True, "e": [1, 2, {"z": 0, "y": 1}]},
+    {"nan": float("nan")},
+    {"inf": float("inf"), "ninf": float("-inf")},
+    {"nested": [{"v": [math.nan]}]},
+    {"f": [1e16, 1.5e-7, 1e-05, 0.1, 1e300, 123456789.125, -0.0, 2.0]},
+    {"sym": "BTC/USDT", "note": "café ☕ 日本", "emoji": "\U0001F680"},
+    {2: "b", 10: "a"},
+    {"o": {1: "x", 9: "y", 10: "z"}},
+    {"t": (1, "a", 2.5)},
+]
+
+def test_canonical_bytes_matches_stdlib():
+    for body in CASES:
+        for ea in (True, False):
+            assert canonical_bytes(body, ensure_ascii=ea) == _stdlib(body, ea), (body, ea)
+
+def test_non_json_types_rejected_like_stdlib():
+    import datetime
+    for body in ({"t": datetime.date(2020, 1, 1)}, {"s": {1, 2}}):
+        try:
+            canonical_bytes(body)
+        except TypeError:
+            continue
+        raise AssertionError(f"expected TypeError for {body!r}")
+
+def test_canonical_sign_matches_reference():
+    secret = b"mexc-secret"
+    params = {"symbol": "BTCUSDT", "timestamp": 1700000000000, "side": "BUY",
+              "quantity": "0.001", "newClientOrderId": "a b/c"}
+    qs, sig = canonical_sign(secret, params)
+    assert qs == urlencode(sorted(params.items()))
+    assert sig == hmac.new(secret, qs.encode(), hashlib.sha256).hexdigest()
+
+def test_signed_request_signs_the_bytes_it_returns():
+    body = {"agent_id": "edge-1", "ts": 1700000000, "note": "café", "px": 1e-05}
+    raw, hdrs = signed_request(body, "s3cret")
+    assert raw == _stdlib(body)
+    want = hmac.new(b"s3cret", raw, hashlib.sha256).hexdigest()
+    assert hdrs["X-Nova-Signature"] == hdrs["X-NT-Sig"] == want
+    assert signed_request(body, "")[1]["X-Nova-Signature"] == ""
+
+def test_sign_reuses_prototypes_per_secret():
+    body = {"agent_id": "edge-1", "ts": 1700000000}
+    for secret in ("a", "b", "a", "ü" * 80):  # interleaved; >64B key gets hashed
+        want = hmac.new(secret.encode(), _stdlib(body), hashlib.sha256).hexdigest()
+        assert sign(body, secret) == want
+        assert get_auth_headers(body, secret)["X-Nova-Signature"] == want
+    assert sign(body, "") == ""
+
+if __name__ == "__main__":
+    test_canonical_bytes_matches_stdlib()
+    test_non_json_types_rejected_like_stdlib()
+    test_canonical_sign_matches_reference()
+    test_signed_request_signs_the_bytes_it_returns()
+    test_sign_reuses_prototypes_per_secret()
+    print("ok")
@@ -0,0 +1,59 @@
+# test_kraken_executor.py — Kraken request signing regression checks
+import base64, hashlib, hmac, urllib.parse
+import pytest
+from executors import kraken_executor as kx
+
+SECRET_B64 = base64.b64encode(b"kraken-test-secret-" * 4).decode()
+
+def _ref_sign(path, data, nonce):
+    post = urllib.parse.urlencode({**data, "nonce": nonce})
+    sha = hashlib.sha256((nonce + post).encode()).digest()
+    mac = hmac.new(base64.b64decode(SECRET_B64), path.encode() + sha, hashlib.sha512)
+    return base64.b64encode(mac.digest()).decode(), post
+
+@pytest.fixture(autouse=True)
+def _isolated_nonce(monkeypatch, tmp_path):
+    # keep the atexit write from landing in the CWD
+    monkeypatch.setattr(kx, "NONCE_FILE", str(tmp_path / "nonce"))
+    monkeypatch.setattr(kx, "_NONCE_ISSUED", 0)
+    monkeypatch.setattr(kx, "_NONCE_LAST", kx._NONCE_LAST)
+
+def test_fast_urlencode_matches_urlencode():
+    cases = [
+        [("pair", "XBTUSD"), ("type", "buy"), ("ordertype", "market"), ("volume", "0.0001")],
+        [("price", 65000.5), ("leverage", 2), ("oflags", "fciq,post")],
+        [("userref", "a b"), ("note", "café/€"), ("k~-._", "~-._"), ("x", "&=+?#")],
+        [("starttm", 1700000000), ("empty", "")],
+    ]
+    for items in cases:
+        assert kx._fast_urlencode(items) == urllib.parse.urlencode(items)
+
+def test_sign_matches_reference(monkeypatch):
+    monkeypatch.setattr(kx, "KEY", "api-key")
+    monkeypatch.setattr(kx, "SEC", SECRET_B64)
+    data = {"pair": "XBTUSD", "type": "buy", "ordertype": "market", "volume": "0.0001"}
+    for template in (hmac.new(base64.b64decode(SECRET_B64), None, hashlib.sha512), None):
+        monkeypatch.setattr(kx, "_HMAC_TEMPLATE", template)
+        s = kx._sign("/0/private/AddOrder", data)
+        nonce = urllib.parse.parse_qs(s["qs"])["nonce"][0]
+        sig, post = _ref_sign("/0/private/AddOrder", data, nonce)
+        assert s["qs"] == post
+        assert s["hdr"] == {"API-Key": "api-key", "API-Sign": sig}
+    assert "nonce" not in data  # caller's dict is not mutated
+
+def test_nonce_strictly_increasing_and_persisted(monkeypatch, tmp_path):
+    path = tmp_path / "nonce"
+    seen = [int(kx._next_nonce()) for _ in range(2000)]  # many per ms
+    assert all(b > a for a, b in zip(seen, seen[1:]))
+    kx._persist_nonce()
+    assert int(path.read_text()) == seen[-1]
+
+    # A restart with the clock behind the last issued nonce resumes above it.
+    ahead = seen[-1] + 10_000_000
+    path.write_text(str(ahead))
+    monkeypatch.setattr(kx, "_NONCE_LAST", kx._seed_nonce())
+    assert int(kx._next_nonce()) == ahead + 1
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,22 @@
+# test_receipt_bus.py — receipt signature headers against plain hmac.new
+import base64, hashlib, hmac
+import receipt_bus as rb
+
+SECRET = b"edge-secret"
+RAW = b'{"agent_id":"edge-1","cmd_id":"c1","ts":1700000000000}'
+
+def _ref():
+    return hmac.new(SECRET, RAW, hashlib.sha256).digest()
+
+def test_sig_formats(monkeypatch):
+    monkeypatch.setattr(rb, "_HMAC_PROTO", hmac.new(SECRET, None, hashlib.sha256))
+    monkeypatch.setattr(rb, "SIG_FORMAT", "hex")
+    assert rb._sign_headers(RAW, "edge-1")["X-Nova-Signature"] == _ref().hex()
+    monkeypatch.setattr(rb, "SIG_FORMAT", "b64")
+    sig = rb._sign_headers(RAW, "edge-1")["X-Nova-Signature"]
+    assert sig == "b64," + base64.urlsafe_b64encode(_ref()).rstrip(b"=").decode()
+    assert len(sig) == 4 + 43
+
+if __name__ == "__main__":
+    import pytest, sys
+    sys.exit(pytest.main([__file__, "-q"]))